@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2024 Nicholas Maltbie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and
+# associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute,
+# sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING
+# BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Minimal block style yaml writer for the documents generated by gdxml2yml and gdxml2xrefmap.
+# Only supports the subset of yaml used by those documents: nested dicts and lists (or tuples) of strings,
+# bools, ints, and None. Output uses the same layout as PyYAML with default_flow_style=False.
+
+import functools
+import json
+import re
+
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+
+# Strings matching this pattern can be written as plain scalars, anything else is quoted.
+# A colon is only an indicator when followed by a space or at the end of the string.
+_PLAIN_SCALAR = re.compile(r"[A-Za-z_](?:[A-Za-z0-9_ .,()/+=<-]|:(?=[^ ]))*")
+
+# Plain strings that a yaml loader would resolve to a bool or null instead of a string.
+_RESERVED_WORDS = frozenset([
+    "y", "Y", "n", "N",
+    "yes", "Yes", "YES", "no", "No", "NO",
+    "true", "True", "TRUE", "false", "False", "FALSE",
+    "on", "On", "ON", "off", "Off", "OFF",
+    "null", "Null", "NULL",
+])
+
+# Characters json leaves unescaped that yaml does not allow (or folds) inside double quotes.
+_NON_PRINTABLE = re.compile(r"[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]")
+
+
+def _escape_non_printable(match: "re.Match[str]") -> str:
+    return f"\\u{ord(match.group(0)):04x}"
+
+
+def _scalar(value: Any) -> str:
+    if isinstance(value, str):
+        if _PLAIN_SCALAR.fullmatch(value) and value[-1] != " " and value not in _RESERVED_WORDS:
+            return value
+        return _NON_PRINTABLE.sub(_escape_non_printable, json.dumps(value, ensure_ascii=False))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if value is None:
+        return "null"
+    raise TypeError(f"Unsupported yaml scalar type {type(value).__name__}")
+
+
+# Documents reuse a handful of mapping keys thousands of times, so their formatting is cached.
+@functools.lru_cache(maxsize=None)
+def _key(key: str) -> str:
+    return _scalar(key)
+
+
+def _write_mapping(lines: List[str], mapping: Dict, indent: str, sort_keys: bool) -> None:
+    entries = sorted(mapping.items()) if sort_keys else mapping.items()
+    for key, value in entries:
+        # Most values are strings, check for them first to skip the container checks.
+        if isinstance(value, str):
+            lines.append(f"{indent}{_key(key)}: {_scalar(value)}\n")
+        elif isinstance(value, dict):
+            if len(value):
+                lines.append(f"{indent}{_key(key)}:\n")
+                _write_mapping(lines, value, indent + "  ", sort_keys)
+            else:
+                lines.append(f"{indent}{_key(key)}: {{}}\n")
+        elif isinstance(value, (list, tuple)):
+            if len(value):
+                lines.append(f"{indent}{_key(key)}:\n")
+                _write_sequence(lines, value, indent, sort_keys)
+            else:
+                lines.append(f"{indent}{_key(key)}: []\n")
+        else:
+            lines.append(f"{indent}{_key(key)}: {_scalar(value)}\n")
+
+
+def _write_sequence(lines: List[str], sequence: Sequence, indent: str, sort_keys: bool) -> None:
+    item_indent = indent + "  "
+    for item in sequence:
+        if isinstance(item, dict) and len(item):
+            # Write the mapping indented under the item, then swap the first indent for the dash.
+            start = len(lines)
+            _write_mapping(lines, item, item_indent, sort_keys)
+            lines[start] = f"{indent}- {lines[start][len(item_indent):]}"
+        elif isinstance(item, (dict, list, tuple)):
+            raise TypeError("Unsupported yaml sequence item, expected a scalar or non-empty dict")
+        else:
+            lines.append(f"{indent}- {_scalar(item)}\n")
+
+
+def _toc_lines(classes: List[Dict]) -> List[str]:
+    lines: List[str] = []
+    _write_sequence(lines, classes, "", True)
+    return lines if len(lines) else ["[]\n"]
+
+
+def _items_lines(items: List[Dict], references: Optional[List[Dict]]) -> List[str]:
+    document: Dict[str, Any] = {"items": items}
+    if references is not None:
+        document["references"] = references
+
+    lines: List[str] = []
+    _write_mapping(lines, document, "", False)
+    return lines
+
+
+def _refmap_lines(base_url: str, references: List[Dict]) -> List[str]:
+    lines: List[str] = []
+    _write_mapping(lines, {"baseUrl": base_url, "sorted": True, "references": references}, "", False)
+    return lines
+
+
+def format_items(items: List[Dict], references: Optional[List[Dict]]) -> str:
+    """Format the items and optional references of a managed reference document."""
+    return "".join(_items_lines(items, references))
+
+
+# The dump functions stream lines through the file's buffer rather than joining the whole
+# document into one string first, which keeps peak memory down for large tocs and xrefmaps.
+
+def dump_toc(classes: List[Dict], file: TextIO) -> None:
+    """Write a table of contents list to a file, keys of each entry are sorted."""
+    file.writelines(_toc_lines(classes))
+
+
+def dump_refmap(base_url: str, references: List[Dict], file: TextIO) -> None:
+    """Write a sorted xrefmap with the given base url and references to a file."""
+    file.writelines(_refmap_lines(base_url, references))
@@ -21,15 +21,19 @@
 import argparse
 import os
 import re
-import yaml
 from pathlib import Path
 
 from .make_rst import State, EnumDef, ClassDef, SignalDef, MethodDef, \
     AnnotationDef, ConstantDef, ThemeItemDef, PropertyDef
 from .gdxml_helpers import get_class_state_from_docs, get_class_uid, get_signal_uid, \
-    make_method_signature, get_constant_uid, get_theme_uid, get_method_uid, sanitize_operator_name
+    make_method_signature, get_constant_uid, get_theme_uid, get_method_uid, sanitize_operator_name, \
+    get_filtered_classes, open_text_stream
+from ._fast_yaml import dump_refmap
 from typing import Dict, List, Union
 
+# Characters that are replaced with a dash in documentation anchors.
+CLEAN_HREF_PATTERN = re.compile(r'[^a-zA-Z\d\s:]')
+
 
 def _get_parser():
     parser = argparse.ArgumentParser(
@@ -47,15 +51,11 @@ def main() -> None:
 
     # Create the output folder recursively if it doesn't already exist.
     os.makedirs(Path(args.output).parent, exist_ok=True)
-    pattern = re.compile(args.filter)
 
     base_url = "https://docs.godotengine.org/en/stable/"
     references = []
     state.sort_classes()
-    for class_name, class_def in state.classes.items():
-        if args.filter and not pattern.search(class_def.filepath):
-            continue
-
+    for class_name, class_def in get_filtered_classes(state, args.filter):
         state.current_class = class_name
         class_def.update_class_group(state)
         references.append(get_class_reference(class_def))
@@ -64,16 +64,10 @@ def main() -> None:
     def sort_by_uid(ref):
         return ref["uid"]
     references.sort(key=sort_by_uid)
-    xrefmap_yml = {
-        "baseUrl": base_url,
-        "sorted": True,
-        "references": references
-    }
 
-    with open(args.output, "w", encoding="utf-8", newline="\n") as file:
-        file.write("### YamlMime:XRefMap")
-        file.write("\n")
-        file.write(yaml.dump(xrefmap_yml, default_flow_style=False, sort_keys=False))
+    with open_text_stream(args.output) as file:
+        file.write("### YamlMime:XRefMap\n")
+        dump_refmap(base_url, references, file)
 
 
 def get_child_references(class_def: ClassDef, state: State) -> List[Dict]:  # noqa: C901 # TODO: Fix this function!
@@ -85,16 +79,16 @@ def get_child_references(class_def: ClassDef, state: State) -> List[Dict]:  # no
     for property_def in class_def.properties.values():
         references.append(get_property_reference(property_def, class_def, state))
     for method_list in class_def.annotations.values():
-        for _, annotation_def in enumerate(method_list):
+        for annotation_def in method_list:
             references.append(get_method_reference(annotation_def, class_def, state))
     for method_list in class_def.constructors.values():
-        for _, constructor_def in enumerate(method_list):
+        for constructor_def in method_list:
             references.append(get_method_reference(constructor_def, class_def, state))
     for method_list in class_def.operators.values():
-        for _, operator_def in enumerate(method_list):
+        for operator_def in method_list:
             references.append(get_method_reference(operator_def, class_def, state, True))
     for method_list in class_def.methods.values():
-        for _, method_def in enumerate(method_list):
+        for method_def in method_list:
             references.append(get_method_reference(method_def, class_def, state))
     for theme_item_def in class_def.theme_items.values():
         references.append(get_theme_item_reference(theme_item_def, class_def, state))
@@ -106,24 +100,25 @@ def get_child_references(class_def: ClassDef, state: State) -> List[Dict]:  # no
 
 def get_enum_references(enum_def: EnumDef, class_def: ClassDef) -> List[Dict]:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     enum_uid = f"{class_name}.{enum_def.name}"
-    enum_href_id = clean_href(f"enum-{class_name.lower()}-{enum_def.name}")
+    enum_href_id = clean_href(f"enum-{class_name_lower}-{enum_def.name}")
     enum_ref = {
         "uid": enum_uid,
         "name": enum_def.name,
-        "href": f"classes/class_{class_name.lower()}.html#{enum_href_id}",
+        "href": f"classes/class_{class_name_lower}.html#{enum_href_id}",
         "commentId": f"T:{enum_uid}",
-        "nameWithType": f"{class_name}.{enum_def.name}",
+        "nameWithType": enum_uid,
     }
 
     enum_values = [enum_ref]
     for value_name, value_def in enum_def.values.items():
         value_uid = f"{enum_uid}.{value_name}"
-        value_href_id = clean_href(f"class-{class_name.lower()}-{value_def.definition_name}-{value_name}")
+        value_href_id = clean_href(f"class-{class_name_lower}-{value_def.definition_name}-{value_name}")
         value_ref = {
             "uid": value_uid,
             "name": value_name,
-            "href": f"classes/class_{class_name.lower()}.html#{value_href_id}",
+            "href": f"classes/class_{class_name_lower}.html#{value_href_id}",
             "commentId": f"F:{value_uid}",
             "nameWithType": value_uid,
         }
@@ -146,13 +141,14 @@ def get_class_reference(class_def: ClassDef) -> Dict:
 
 def get_signal_reference(signal_def: SignalDef, class_def: ClassDef, state: State) -> Dict:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     signal_uid = get_signal_uid(signal_def, class_def, state)
     signal_name = make_method_signature(signal_def, True, False, False, state, False)
     signal_href = clean_href(signal_def.name)
     return {
         "uid": signal_uid,
         "name": signal_name,
-        "href": f"classes/class_{class_name.lower()}.html#class-{class_name.lower()}-signal-{signal_href}",
+        "href": f"classes/class_{class_name_lower}.html#class-{class_name_lower}-signal-{signal_href}",
         "commentId": f"E:{signal_uid}",
         "nameWithType": f"{class_name}.{signal_name}",
     }
@@ -160,14 +156,15 @@ def get_signal_reference(signal_def: SignalDef, class_def: ClassDef, state: Stat
 
 def get_constant_reference(constant_def: ConstantDef, class_def: ClassDef, state: State) -> Dict:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     constant_uid = get_constant_uid(constant_def, class_def)
-    constant_href_id = clean_href(f"class-{class_name.lower()}-constant-{constant_def.name}")
+    constant_href_id = clean_href(f"class-{class_name_lower}-constant-{constant_def.name}")
     return {
         "uid": constant_uid,
         "name": constant_def.name,
-        "href": f"classes/class_{class_name.lower()}.html#{constant_href_id}",
+        "href": f"classes/class_{class_name_lower}.html#{constant_href_id}",
         "commentId": f"E:{constant_uid}",
-        "nameWithType": f"{class_name}.{constant_def.name}",
+        "nameWithType": constant_uid,
     }
 
 
@@ -177,15 +174,16 @@ def get_method_reference(
         state: State,
         include_params: bool = False) -> Dict:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     method_uid = get_method_uid(method_def, class_def, state)
     method_name = make_method_signature(method_def, True, False, False, state, False)
     temp = make_method_href(method_def, state, include_params)
     method_href_id = clean_href(
-        f"class-{class_name.lower()}-{method_def.definition_name}-{temp}")
+        f"class-{class_name_lower}-{method_def.definition_name}-{temp}")
     return {
         "uid": method_uid,
         "name": method_name,
-        "href": f"classes/class_{class_name.lower()}.html#{method_href_id}",
+        "href": f"classes/class_{class_name_lower}.html#{method_href_id}",
         "commentId": f"M:{method_uid}",
         "nameWithType": f"{class_name}.{method_def.name}",
     }
@@ -193,14 +191,15 @@ def get_method_reference(
 
 def get_property_reference(property_def: PropertyDef, class_def: ClassDef, state: State) -> Dict:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     property_uid = f"{class_name}.{property_def.name}"
-    property_href_id = clean_href(f"class-{class_name.lower()}-property-{property_def.name}")
+    property_href_id = clean_href(f"class-{class_name_lower}-property-{property_def.name}")
     return {
         "uid": property_uid,
         "name": property_def.name,
-        "href": f"classes/class_{class_name.lower()}.html#{property_href_id}",
+        "href": f"classes/class_{class_name_lower}.html#{property_href_id}",
         "commentId": f"P:{property_uid}",
-        "nameWithType": f"{class_name}.{property_def.name}",
+        "nameWithType": property_uid,
     }
 
 
@@ -233,20 +232,21 @@ def make_method_href(
 
 def get_theme_item_reference(theme_item_def: ThemeItemDef, class_def: ClassDef, state: State) -> Dict:
     class_name = class_def.name
+    class_name_lower = class_name.lower()
     theme_item_id = get_theme_uid(theme_item_def, class_def)
     theme_item_href_id = clean_href(
-        f"class-{class_name.lower()}-theme-{theme_item_def.data_name}-{theme_item_def.name}")
+        f"class-{class_name_lower}-theme-{theme_item_def.data_name}-{theme_item_def.name}")
     return {
         "uid": theme_item_id,
         "name": theme_item_def.name,
-        "href": f"classes/class_{class_name.lower()}.html#{theme_item_href_id}",
+        "href": f"classes/class_{class_name_lower}.html#{theme_item_href_id}",
         "commentId": f"M:{theme_item_id}",
-        "nameWithType": f"{class_name}.{theme_item_def.name}",
+        "nameWithType": theme_item_id,
     }
 
 
 def clean_href(name: str) -> str:
-    return re.sub(r'[^a-zA-Z\d\s:]', '-', name.replace("@", "")).lower()
+    return CLEAN_HREF_PATTERN.sub('-', name.replace("@", "")).lower()
 
 
 if __name__ == "__main__":
@@ -19,23 +19,29 @@
 # SOFTWARE.
 
 import argparse
+import concurrent.futures
+import functools
 import os
-import pathvalidate
 import re
-import yaml
+import pathvalidate
 
 from .make_rst import AnnotationDef, MethodDef, SignalDef, State, \
-    PropertyDef, ClassDef, EnumDef, TypeName
-from typing import Dict, List, Tuple, Union
+    PropertyDef, ClassDef, EnumDef, TypeName, ConstantDef, ThemeItemDef
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from ._fast_yaml import dump_toc, format_items
 from .gdxml_helpers import make_link, format_text_block, full_type_name, \
-    make_method_signature, get_method_uid, get_method_qualifiers, get_method_return_type, \
-    make_setter_signature, make_getter_signature, get_class_uid, get_signal_uid, \
-    get_constant_uid, get_theme_uid, get_class_state_from_docs
+    make_method_signatures, get_method_qualifiers, get_method_return_type, \
+    make_setter_signature, make_getter_signature, get_class_uid, \
+    get_constant_uid, get_theme_uid, get_class_state_from_docs, get_filtered_classes, \
+    open_text_stream, write_text_file, collect_diagnostics, write_diagnostics, get_state_cache
 
 
 yml_mime_managed_reference_prefix = "### YamlMime:ManagedReference"
 yml_mime_toc_prefix = "### YamlMime:TableOfContent"
 
+# Languages listed on every item, a tuple so it can be safely shared between every item.
+yml_langs = ("gdscript", "csharp")
+
 
 def dir_path(string):
     if os.path.isdir(string):
@@ -44,33 +50,35 @@ def dir_path(string):
         raise NotADirectoryError(string)
 
 
+# File names made only of these characters are left unchanged by pathvalidate on every platform.
+SAFE_FILE_NAME_PATTERN = re.compile(r"[A-Za-z0-9@_.-]+")
+
+
+@functools.lru_cache(maxsize=None)
+def _sanitize_output_dir(output: str) -> str:
+    return pathvalidate.sanitize_filepath(output)
+
+
+def _get_output_path(output: str, file_name: str) -> str:
+    """Get the sanitized path of an output file, only sanitizing the output folder once for typical names."""
+    if SAFE_FILE_NAME_PATTERN.fullmatch(file_name):
+        return os.path.join(_sanitize_output_dir(output), file_name)
+    return pathvalidate.sanitize_filepath(os.path.join(output, file_name))
+
+
 def make_yml_toc(classes: List[Dict], output: str) -> None:
-    with open(
-        os.path.join(output, "toc.yml"),
-        "w",
-        encoding="utf-8",
-        newline="\n"
-    ) as file:
-        file.write(yml_mime_toc_prefix)
-        file.write("\n")
-        file.write(yaml.dump(
-            classes,
-            default_flow_style=False,
-            sort_keys=True))
+    with open_text_stream(os.path.join(output, "toc.yml")) as file:
+        file.write(f"{yml_mime_toc_prefix}\n")
+        dump_toc(classes, file)
 
 
 def make_yml_enum(class_name: str, enum_def: EnumDef, state: State, output: str) -> str:
     enum_name = enum_def.name
     output_file = enum_name.lower().replace("/", "--")
-    with open(
-        pathvalidate.sanitize_filepath(os.path.join(output, f"enum_{class_name}_{output_file}.yml")),
-        "w",
-        encoding="utf-8",
-        newline="\n"
-    ) as file:
-        file.write(yml_mime_managed_reference_prefix)
-        file.write("\n")
-        file.write(_get_enum_yml(class_name, enum_name, enum_def, state))
+    items = _get_enum_yml(class_name, enum_name, enum_def, state)
+    write_text_file(
+        _get_output_path(output, f"enum_{class_name}_{output_file}.yml"),
+        f"{yml_mime_managed_reference_prefix}\n{format_items(items, None)}")
 
     return output_file
 
@@ -78,41 +86,51 @@ def make_yml_enum(class_name: str, enum_def: EnumDef, state: State, output: str)
 def make_yml_class(class_def: ClassDef, state: State, output: str) -> str:
     class_name = class_def.name
     output_file = class_name.lower().replace("/", "--")
-    with open(
-        pathvalidate.sanitize_filepath(os.path.join(output, f"class_{output_file}.yml")),
-        "w",
-        encoding="utf-8",
-        newline="\n"
-    ) as file:
-        file.write(yml_mime_managed_reference_prefix)
-        file.write("\n")
-        file.write(_get_class_yml(class_name, class_def, state))
+    items, references = _get_class_yml(class_name, class_def, state)
+    write_text_file(
+        _get_output_path(output, f"class_{output_file}.yml"),
+        f"{yml_mime_managed_reference_prefix}\n{format_items(items, references)}")
 
     return output_file
 
 
+def _get_class_children(state: State) -> Dict[str, List[str]]:
+    """Gets the classes that directly inherit each class, built once for the classes of a state."""
+    class_indexes = get_state_cache(state, "class_indexes")
+    children = class_indexes.get("class_children")
+    if children is None:
+        children = class_indexes["class_children"] = {}
+        for c in state.classes.values():
+            if c.inherits:
+                children.setdefault(c.inherits, []).append(c.name)
+
+    return children
+
+
 def _get_class_descendants(class_name: str, state: State) -> List[str]:
     """Gets the list of all classes that inherit a given class from a state."""
-    inherited: List[str] = []
-    for c in state.classes.values():
-        if c.inherits and c.inherits.strip() == class_name:
-            inherited.append(c.name)
+    return list(_get_class_children(state).get(class_name, []))
 
-    return inherited
+
+def _get_class_ancestors(class_name: str, state: State) -> Tuple[str, ...]:
+    """Get the classes a class inherits from in order, cached per state so shared ancestry is only walked once."""
+    class_ancestors = get_state_cache(state, "class_ancestors")
+    ancestors = class_ancestors.get(class_name)
+    if ancestors is None:
+        ancestors = ()
+        if class_name in state.classes:
+            inode = state.classes[class_name].inherits
+            if inode:
+                ancestors = (inode,) + _get_class_ancestors(inode, state)
+        class_ancestors[class_name] = ancestors
+
+    return ancestors
 
 
 def _get_class_inheritance(class_def: ClassDef, state: State) -> List[str]:
     """Get the class inheritance in order for a given class and state."""
-    inherits = class_def.inherits.strip()
-    all_inherits = [inherits]
-    while inherits in state.classes:
-        inode = state.classes[inherits].inherits
-        if inode:
-            inherits = inode.strip()
-            all_inherits.append(inode)
-        else:
-            break
-    return all_inherits
+    inherits = class_def.inherits
+    return [inherits, *_get_class_ancestors(inherits, state)]
 
 
 def _get_seealso_list(class_def: ClassDef) -> List[Dict]:
@@ -132,26 +150,28 @@ def _get_seealso_list(class_def: ClassDef) -> List[Dict]:
     return seealso
 
 
-def _get_enum_yml(class_name: str, enum_name: str, enum_def: EnumDef, state: State) -> str:
+def _get_enum_yml(class_name: str, enum_name: str, enum_def: EnumDef, state: State) -> List[Dict]:
     enum_id = f"{class_name}.{enum_name}"
     enum_yml = {
         "uid": enum_id,
         "commentId": "T:" + enum_id,
         "id": enum_name,
-        "langs": ["gdscript", "csharp"],
+        "langs": yml_langs,
         "name": enum_name,
         "nameWithType": enum_id,
         "type": "Enum",
     }
 
+    items = [enum_yml]
     children = []
     for value_name, value_def in enum_def.values.items():
         value_id = f"{enum_id}.{value_name}"
+        children.append(value_id)
         value_yml = {
             "uid": value_id,
             "commentId": f"F:{value_id}",
             "id": value_name,
-            "langs": ["gdscript", "csharp"],
+            "langs": yml_langs,
             "name": value_name,
             "nameWithType": value_id,
             "type": "Field",
@@ -162,14 +182,14 @@ def _get_enum_yml(class_name: str, enum_name: str, enum_def: EnumDef, state: Sta
                 "return": {"type": full_type_name(value_id, state)}
             }
         }
-        children.append(value_yml)
+        items.append(value_yml)
 
-    enum_yml["children"] = [value["uid"] for value in children]
-    items = [enum_yml] + children
-    return yaml.dump({"items": items}, default_flow_style=False, sort_keys=False)
+    enum_yml["children"] = children
+    return items
 
 
-def _make_reference_yml(type_def: TypeName, state: State):
+def _make_reference_yml(type_def: TypeName, state: State) -> Dict:
+    # Each member gets its own dict, only the type name lookup is cached.
     full_name = full_type_name(type_def.type_name, state)
     return {
         "uid": full_name,
@@ -183,10 +203,8 @@ def _get_method_yml(
         state: State, method_type: str
 ) -> Tuple[Dict[str, Dict], Dict]:
     references = {}
-    signature_short = make_method_signature(method_def, False, False, False, state, True)
-    signature_spaces = make_method_signature(method_def, True, False, False, state, False)
-    signature_spaces_named = make_method_signature(method_def, True, True, False, state, False)
-    full_name = get_method_uid(method_def, class_def, state)
+    signature_short, signature_spaces, signature_spaces_named = make_method_signatures(method_def, state, True)
+    full_name = f"{get_class_uid(class_def)}.{signature_short}"
 
     summary = ""
     if method_def.qualifiers:
@@ -202,7 +220,7 @@ def _get_method_yml(
         "uid": full_name,
         "commentId": f"M:{full_name}",
         "id": signature_short,
-        "langs": ["gdscript", "csharp"],
+        "langs": yml_langs,
         "name": signature_spaces,
         "nameWithType": f"{class_def.name}.{signature_spaces}",
         "type": method_type,
@@ -240,7 +258,7 @@ def get_property_yml(class_name: str, property_def: PropertyDef, state: State, c
         "uid": property_id,
         "commentId": f"P:{property_id}",
         "id": property_def.name,
-        "langs": ["gdscript", "csharp"],
+        "langs": yml_langs,
         "name": property_def.name,
         "nameWithType": property_id,
         "type": "Property",
@@ -270,22 +288,153 @@ def get_property_yml(class_name: str, property_def: PropertyDef, state: State, c
     return property_yml
 
 
-def _get_class_yml(  # noqa: C901 # TODO: Fix this function!
-        class_name: str, class_def: ClassDef, state: State) -> str:
+def _get_signal_yml(class_def: ClassDef, signal: SignalDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    references = {}
+    signature_short, signature_spaces, signature_spaces_named = make_method_signatures(signal, state, False)
+    signal_id = f"{get_class_uid(class_def)}.{signature_short}"
+    signal_yml = {
+        "uid": signal_id,
+        "commentId": f"E:{signal_id}",
+        "id": signature_short,
+        "langs": yml_langs,
+        "name": signature_spaces,
+        "nameWithType": f"{class_def.name}.{signature_spaces}",
+        "type": "Event",
+        "syntax": {
+            "content": f"signal {signature_spaces_named}",
+            "parameters": [
+                {
+                    "id": parameter.name,
+                    "type": parameter.type_name.type_name,
+                }
+                for parameter in signal.parameters
+            ],
+        },
+        "summary": format_text_block(signal.description.strip(), signal, state),
+        "parent": class_def.name,
+    }
+
+    # add all types of parameter as references
+    for parameter in signal.parameters:
+        references[parameter.type_name.type_name] = _make_reference_yml(parameter.type_name, state)
+
+    return references, signal_yml
+
+
+def _get_constant_yml(class_def: ClassDef, constant: ConstantDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    constant_id = get_constant_uid(constant, class_def)
+    constant_yml = {
+        "uid": constant_id,
+        "commentId": f"F:{constant_id}",
+        "id": constant.name,
+        "langs": yml_langs,
+        "name": constant.name,
+        "nameWithType": constant_id,
+        "type": "Field",
+        "summary": format_text_block(constant.text, class_def, state),
+        "syntax":
+        {
+            "content": f"const {constant.name} = {constant.value}",
+        },
+        "parent": class_def.name,
+    }
+
+    return {}, constant_yml
+
+
+def _get_annotation_yml(
+        class_def: ClassDef, annotation: AnnotationDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    references, annotation_yml = _get_method_yml(class_def, annotation, state, "Property")
+    annotation_yml["summary"] = "**Annotation**\n\n" + annotation_yml["summary"]
+    return references, annotation_yml
+
+
+def _get_property_member_yml(
+        class_def: ClassDef, property_def: PropertyDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    property_yml = get_property_yml(class_def.name, property_def, state, class_def)
+    return {property_def.type_name.type_name: _make_reference_yml(property_def.type_name, state)}, property_yml
+
+
+def _get_constructor_yml(class_def: ClassDef, method: MethodDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    return _get_method_yml(class_def, method, state, "Constructor")
+
+
+def _get_method_member_yml(class_def: ClassDef, method: MethodDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    return _get_method_yml(class_def, method, state, "Method")
+
+
+def _get_operator_yml(class_def: ClassDef, method: MethodDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    return _get_method_yml(class_def, method, state, "Operator")
+
+
+def _get_theme_item_yml(
+        class_def: ClassDef, theme_item_def: ThemeItemDef, state: State) -> Tuple[Dict[str, Dict], Dict]:
+    theme_item_id = get_theme_uid(theme_item_def, class_def)
+    syntax = f"{theme_item_def.type_name.type_name} {theme_item_def.name}"
+    if theme_item_def.default_value is not None:
+        syntax = f" = {theme_item_def.default_value}"
+    theme_yml = {
+        "uid": theme_item_id,
+        "commentId": f"P:{theme_item_id}",
+        "id": theme_item_def.name,
+        "langs": yml_langs,
+        "name": theme_item_def.name,
+        "nameWithType": theme_item_id,
+        "type": "Property",
+        "summary": "**Theme Property**\n\n" + format_text_block(theme_item_def.text.strip(), theme_item_def, state),
+        "syntax":
+        {
+            "content": syntax,
+            "return": {"type": full_type_name(theme_item_def.type_name.type_name, state)}
+        },
+        "parent": class_def.name,
+    }
+
+    return {theme_item_def.type_name.type_name: _make_reference_yml(theme_item_def.type_name, state)}, theme_yml
+
+
+def _get_children_yml(class_def: ClassDef, state: State) -> Tuple[List[Dict], List[str], Dict[str, Dict]]:
+    """Get the yml and uid for every member of a class in documentation order, and the types they reference."""
+    children: List[Dict] = []
+    child_uids: List[str] = []
+
+    # Referenced data types, see ReferenceViewModel
+    # https://github.com/dotnet/docfx/blob/main/src/Docfx.DataContracts.Common/ReferenceViewModel.cs
+    references: Dict[str, Dict] = {}
+
+    # Signal, constant, annotation, property, constructor, method, operator, and theme property descriptions
+    members = [
+        (class_def.signals.values(), _get_signal_yml),
+        (class_def.constants.values(), _get_constant_yml),
+        ((m for method_list in class_def.annotations.values() for m in method_list), _get_annotation_yml),
+        ((p for p in class_def.properties.values() if not p.overrides), _get_property_member_yml),
+        ((m for method_list in class_def.constructors.values() for m in method_list), _get_constructor_yml),
+        ((m for method_list in class_def.methods.values() for m in method_list), _get_method_member_yml),
+        ((m for method_list in class_def.operators.values() for m in method_list), _get_operator_yml),
+        (class_def.theme_items.values(), _get_theme_item_yml),
+    ]
+    for definitions, get_member_yml in members:
+        for definition in definitions:
+            member_references, member_yml = get_member_yml(class_def, definition, state)
+            references.update(member_references)
+            children.append(member_yml)
+            child_uids.append(member_yml["uid"])
+
+    return children, child_uids, references
+
+
+def _get_class_yml(
+        class_name: str, class_def: ClassDef, state: State) -> Tuple[List[Dict], List[Dict]]:
     class_yml = {
         "uid": get_class_uid(class_def),
         "commentId": "T:" + class_name,
         "id": class_name,
-        "langs": ["gdscript", "csharp"],
+        "langs": yml_langs,
         "name": class_name,
         "nameWithType": class_name,
         "type": "Class",
     }
 
-    # Referenced data types, see ReferenceViewModel
-    # https://github.com/dotnet/docfx/blob/main/src/Docfx.DataContracts.Common/ReferenceViewModel.cs
-    references = dict()
-
     # INHERITANCE TREE
     # Ascendants
     if class_def.inherits:
@@ -300,188 +449,56 @@ def _get_class_yml(  # noqa: C901 # TODO: Fix this function!
     # Brief description
     # See Summary tag definition -
     #  https://learn.microsoft.com/en-us/dotnet/csharp/language-reference/xmldoc/recommended-tags#summary
-    if class_def.brief_description is not None and class_def.brief_description.strip() != "":
-        class_yml["summary"] = format_text_block(
-            class_def.brief_description.strip(),
-            class_def,
-            state)
+    brief_description = (class_def.brief_description or "").strip()
+    if brief_description != "":
+        class_yml["summary"] = format_text_block(brief_description, class_def, state)
 
     # Class description
     # See Remarks tag definition -
     #  https://learn.microsoft.com/en-us/dotnet/csharp/language-reference/xmldoc/recommended-tags#remarks
-    if class_def.description is not None and class_def.description.strip() != "":
-        class_yml["remarks"] = format_text_block(
-            class_def.description.strip(),
-            class_def,
-            state)
+    description = (class_def.description or "").strip()
+    if description != "":
+        class_yml["remarks"] = format_text_block(description, class_def, state)
 
     # Online tutorials (implemented via seealso)
     #  https://learn.microsoft.com/en-us/dotnet/csharp/language-reference/xmldoc/recommended-tags#seealso
     if len(class_def.tutorials) > 0:
         class_yml["seealso"] = _get_seealso_list(class_def)
 
-    # Signal descriptions
-    signals = []
-    for signal in class_def.signals.values():
-        signature_short = make_method_signature(signal, False, False, False, state, False)
-        signature_spaces = make_method_signature(signal, True, False, False, state, False)
-        signature_spaces_named = make_method_signature(signal, True, True, False, state, False)
-        signal_id = get_signal_uid(signal, class_def, state)
-        signal_yml = {
-            "uid": signal_id,
-            "commentId": f"E:{signal_id}",
-            "id": signature_short,
-            "langs": ["gdscript", "csharp"],
-            "name": signature_spaces,
-            "nameWithType": f"{class_name}.{signature_spaces}",
-            "type": "Event",
-            "syntax": {
-                "content": f"signal {signature_spaces_named}",
-                "parameters": [
-                    {
-                        "id": parameter.name,
-                        "type": parameter.type_name.type_name,
-                    }
-                    for parameter in signal.parameters
-                ],
-            },
-            "summary": format_text_block(signal.description.strip(), signal, state),
-            "parent": class_name,
-        }
-
-        # add all types of parameter as references
-        for parameter in signal.parameters:
-            references[parameter.type_name.type_name] = _make_reference_yml(parameter.type_name, state)
-
-        signals.append(signal_yml)
-
-    # Constant descriptions
-    constants = []
-    for constant in class_def.constants.values():
-        constant_id = get_constant_uid(constant, class_def)
-        constant_yml = {
-            "uid": constant_id,
-            "commentId": f"F:{constant_id}",
-            "id": constant.name,
-            "langs": ["gdscript", "csharp"],
-            "name": constant.name,
-            "nameWithType": constant_id,
-            "type": "Field",
-            "summary": format_text_block(constant.text, class_def, state),
-            "syntax":
-            {
-                "content": f"const {constant.name} = {constant.value}",
-            },
-            "parent": class_name,
-        }
-        constants.append(constant_yml)
-
-    # Annotation descriptions
-    annotations = []
-    for method_list in class_def.annotations.values():
-        for _, m in enumerate(method_list):
-            annotation_ref, annotation_yml = _get_method_yml(class_def, m, state, "Property")
-            annotation_yml["summary"] = "**Annotation**\n\n" + annotation_yml["summary"]
-            references.update(annotation_ref)
-            annotations.append(annotation_yml)
-
-    # Property descriptions
-    properties = []
-    if any(not p.overrides for p in class_def.properties.values()) > 0:
-        for property_def in class_def.properties.values():
-            if property_def.overrides:
-                continue
-            property_yml = get_property_yml(class_name, property_def, state, class_def)
-            properties.append(property_yml)
-            references[property_def.type_name.type_name] = _make_reference_yml(property_def.type_name, state)
-
-    # Constructor, Method, Operator descriptions
-    constructors = []
-    for method_list in class_def.constructors.values():
-        for _, m in enumerate(method_list):
-            constructor_ref, constructor_yml = _get_method_yml(class_def, m, state, "Constructor")
-            references.update(constructor_ref)
-            constructors.append(constructor_yml)
-
-    methods = []
-    for method_list in class_def.methods.values():
-        for _, m in enumerate(method_list):
-            method_ref, method_yml = _get_method_yml(class_def, m, state, "Method")
-            references.update(method_ref)
-            constructors.append(method_yml)
-
-    operators = []
-    for method_list in class_def.operators.values():
-        for _, m in enumerate(method_list):
-            operator_ref, operator_yml = _get_method_yml(class_def, m, state, "Operator")
-            references.update(operator_ref)
-            operators.append(operator_yml)
-
-    # Theme property descriptions
-    theme_properties = []
-    for theme_item_def in class_def.theme_items.values():
-        theme_item_id = get_theme_uid(theme_item_def, class_def)
-        syntax = f"{theme_item_def.type_name.type_name} {theme_item_def.name}"
-        if theme_item_def.default_value is not None:
-            syntax = f" = {theme_item_def.default_value}"
-        theme_yml = {
-            "uid": theme_item_id,
-            "commentId": f"P:{theme_item_id}",
-            "id": theme_item_def.name,
-            "langs": ["gdscript", "csharp"],
-            "name": theme_item_def.name,
-            "nameWithType": theme_item_id,
-            "type": "Property",
-            "summary": "**Theme Property**\n\n" + format_text_block(theme_item_def.text.strip(), theme_item_def, state),
-            "syntax":
-            {
-                "content": syntax,
-                "return": {"type": full_type_name(theme_item_def.type_name.type_name, state)}
-            },
-            "parent": class_name,
-        }
+    children, child_uids, references = _get_children_yml(class_def, state)
+    if len(child_uids):
+        class_yml["children"] = child_uids
 
-        references[theme_item_def.type_name.type_name] = _make_reference_yml(theme_item_def.type_name, state)
-        theme_properties.append(theme_yml)
+    children.insert(0, class_yml)
+    return children, list(references.values())
 
-    children = signals + constants + annotations + properties + constructors + methods + operators + theme_properties
-    if len(children):
-        class_yml["children"] = [child["uid"] for child in children]
 
-    items = [class_yml] + children
-    return yaml.dump(
-        {
-            "items": items,
-            "references": list(references.values())
-        }, default_flow_style=False, sort_keys=False)
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def _get_parser():
     parser = argparse.ArgumentParser(description='Convert godot documentation xml file to yml for docfx.')
     parser.add_argument("path", nargs="+", help="A path to an XML file or a directory containing XML files to parse.")
     parser.add_argument("--filter", default="", help="The filepath pattern for XML files to filter.")
+    parser.add_argument(
+        "--jobs", type=_positive_int, default=os.cpu_count() or 1,
+        help="Number of processes used to generate yml files, defaults to the number of CPUs.")
     parser.add_argument('output', help='output folder to store all generated yml files.')
     return parser
 
 
-def main() -> None:
-    args = _get_parser().parse_args()
-
-    state: State = get_class_state_from_docs(args.path)
-
-    # Create the output folder recursively if it doesn't already exist.
-    os.makedirs(args.output, exist_ok=True)
-    pattern = re.compile(args.filter)
-
-    class_files = []
-    state.sort_classes()
-    for class_name, class_def in state.classes.items():
-        if args.filter and not pattern.search(class_def.filepath):
-            continue
+def _make_yml_class_and_enums(class_name: str, state: State, output: str) -> Tuple[Dict, List[str]]:
+    """Write the yml files for a class and its enums, returns the toc entry and the diagnostics for the class."""
+    class_def = state.classes[class_name]
+    state.current_class = class_name
 
-        state.current_class = class_name
-        class_def.update_class_group(state)
-        class_file_path = make_yml_class(class_def, state, args.output)
+    # Diagnostics are returned rather than printed so they are written in class order, even from worker processes.
+    with collect_diagnostics() as diagnostics:
+        class_file_path = make_yml_class(class_def, state, output)
         toc_yml = {
             "uid": class_name,
             "name": class_file_path,
@@ -489,14 +506,70 @@ def main() -> None:
 
         enum_toc_yml = []
         for enum_name, enum_def in class_def.enums.items():
-            make_yml_enum(class_name, enum_def, state, args.output)
+            make_yml_enum(class_name, enum_def, state, output)
             ref_yml = {"uid": f"{class_name}.{enum_name}", "name": enum_name}
             enum_toc_yml.append(ref_yml)
 
-        if len(enum_toc_yml):
-            toc_yml["items"] = enum_toc_yml
+    if len(enum_toc_yml):
+        toc_yml["items"] = enum_toc_yml
+
+    return toc_yml, diagnostics
+
 
+# State shared with each worker process, set once by _init_worker instead of pickled per class.
+_worker_state: Optional[State] = None
+_worker_output: str = ""
+
+
+def _init_worker(state: State, output: str) -> None:
+    global _worker_state, _worker_output
+    _worker_state = state
+    _worker_output = output
+
+
+def _make_yml_class_worker(class_name: str) -> Tuple[Dict, List[str]]:
+    assert _worker_state is not None, "_init_worker must run before classes are generated"
+    return _make_yml_class_and_enums(class_name, _worker_state, _worker_output)
+
+
+def _write_class_diagnostics(class_results: Iterable[Tuple[Dict, List[str]]]) -> List[Dict]:
+    """Write the diagnostics of each class as its result arrives in class order, returns the toc entries."""
+    class_files = []
+    for toc_yml, diagnostics in class_results:
+        write_diagnostics(diagnostics)
         class_files.append(toc_yml)
+    return class_files
+
+
+def main() -> None:
+    args = _get_parser().parse_args()
+
+    state: State = get_class_state_from_docs(args.path)
+
+    # Create the output folder recursively if it doesn't already exist.
+    os.makedirs(args.output, exist_ok=True)
+
+    class_names = []
+    state.sort_classes()
+    for class_name, class_def in get_filtered_classes(state, args.filter):
+        state.current_class = class_name
+        class_def.update_class_group(state)
+        class_names.append(class_name)
+
+    # Each class is written to its own files, so classes can be generated independently.
+    jobs = min(args.jobs, len(class_names))
+    if jobs > 1:
+        # A few chunks per worker keeps the load balanced without a round trip for every class.
+        chunksize = max(1, len(class_names) // (jobs * 4))
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(state, args.output)) as executor:
+            class_files = _write_class_diagnostics(
+                executor.map(_make_yml_class_worker, class_names, chunksize=chunksize))
+    else:
+        class_files = _write_class_diagnostics(
+            _make_yml_class_and_enums(class_name, state, args.output) for class_name in class_names)
 
     make_yml_toc(class_files, args.output)
 
@@ -18,18 +18,103 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import bisect
+import contextlib
+import functools
+import itertools
 import os
+import re
+import sys
+import threading
+import weakref
 import xml.etree.ElementTree as ET
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from .make_rst import State, DefinitionBase, TagState, MethodDef, \
     SignalDef, AnnotationDef, ParameterDef, ClassDef, PropertyDef, TypeName, \
     ThemeItemDef, ConstantDef, \
-    RESERVED_CODEBLOCK_TAGS, RESERVED_CROSSLINK_TAGS, GODOT_DOCS_PATTERN, \
+    CODEBLOCK_TAGS, CROSSLINK_TAGS, CODE_TAGS, URL_TAGS, GODOT_DOCS_PATTERN, \
     MARKUP_ALLOWED_PRECEDENT, MARKUP_ALLOWED_SUBSEQUENT
-from typing import List, Dict, TextIO, Tuple, Optional, Union
+from typing import AbstractSet, Any, Deque, List, Dict, Iterator, TextIO, Tuple, Optional, Union
+
+# Use lxml to parse xml docs when it is installed, it is considerably faster than ElementTree.
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
 
 GODOT_DOC_URL = "https://docs.godotengine.org/en/stable/"
 
+# Tags that open a code block, the line break pass only has to look for code blocks when one is present.
+CODEBLOCK_OPENING_TAGS = ("[codeblock", "[gdscript", "[csharp")
+
+# Tags that start a code block when they begin a line of text.
+CODEBLOCK_PREFIXES = ("[codeblock]", "[codeblock ", "[gdscript]", "[gdscript ", "[csharp]", "[csharp ")
+
+# Formatting tags that are opened and closed around text, with the markup they open and close with.
+PAIRED_FORMATTING_TAGS = {
+    "center": ("", ""),
+    "i": ("*", "*"),
+    "b": ("**", "**"),
+    "u": ("", ""),
+    "kbd": ("<kbd>`", "`</kbd>"),
+}
+
+# Tags that stand for a single character.
+ESCAPED_CHARACTER_TAGS = {
+    "lb": "[",
+    "rb": "]",
+}
+
+# Tooltips describing each method qualifier.
+QUALIFIER_TOOLTIPS = {
+    "virtual": "This method should typically be overridden by the user to have any effect.",
+    "const": "This method has no side effects. It doesn't modify any of the instance's member variables.",
+    "vararg": "This method accepts any number of arguments after the ones described here.",
+    "constructor": "This method is used to construct a type.",
+    "static": "This method doesn't need an instance to be called, so it can be called directly using the class name.",
+    "operator": "This method describes a valid operator to use with this type as left-hand operand.",
+    "bitfield": "This value is an integer composed as a bitmask of the following flags.",
+    "void": "No return value.",
+}
+
+# Characters that may touch inline markup without an escaped space, as sets for single character lookups.
+MARKUP_ALLOWED_PRECEDENT_CHARS = frozenset(MARKUP_ALLOWED_PRECEDENT)
+MARKUP_ALLOWED_SUBSEQUENT_CHARS = frozenset(MARKUP_ALLOWED_SUBSEQUENT)
+
+# Cross-reference tags that link to a class member, with the class members they are resolved against
+# and the kind of member named in errors.
+MEMBER_REFERENCE_KINDS = {
+    "method": ("methods", "method"),
+    "constructor": ("constructors", "constructor"),
+    "operator": ("operators", "operator"),
+    "member": ("properties", "member"),
+    "signal": ("signals", "signal"),
+    "annotation": ("annotations", "annotation"),
+    "theme_item": ("theme_items", "theme property"),
+    "constant": ("constants", "constant"),
+}
+
+# An underscore that is not followed by a letter or digit, so it ends a word rather than joining snake_case.
+WORD_END_UNDERSCORE_PATTERN = re.compile(r"_(?=[\W_])")
+
+# The tabs indenting a line, always matches (possibly empty).
+TABS_PATTERN = re.compile(r"\t*")
+
+# Spaces at the start of a paragraph, always matches (possibly empty).
+SPACES_PATTERN = re.compile(r" *")
+
+# A line break and the tabs indenting the next line, in text without codeblocks.
+LINE_BREAK_PATTERN = re.compile(r"\n\t*")
+
+# A line break followed by the tabs indenting the next line of code.
+CODE_LINE_TABS_PATTERN = re.compile(r"\n(\t*)")
+
+# lxml parsers must not be shared between threads, so each parsing thread keeps its own.
+_parser_local = threading.local()
+
 STYLES: Dict[str, str] = {}
 STYLES["red"] = "\x1b[91m"
 STYLES["green"] = "\x1b[92m"
@@ -38,6 +123,14 @@ STYLES["bold"] = "\x1b[1m"
 STYLES["regular"] = "\x1b[22m"
 STYLES["reset"] = "\x1b[0m"
 
+# Diagnostics are printed without colour when the NO_COLOR environment variable is set, see https://no-color.org/.
+if os.environ.get("NO_COLOR"):
+    STYLES = dict.fromkeys(STYLES, "")
+
+ERROR_PREFIX = f'{STYLES["red"]}{STYLES["bold"]}ERROR:{STYLES["regular"]} '
+WARNING_PREFIX = f'{STYLES["yellow"]}{STYLES["bold"]}WARNING:{STYLES["regular"]} '
+STYLE_RESET = STYLES["reset"]
+
 operator_lookup = {
     "!=": "neq",
     "==": "eq",
@@ -63,16 +156,80 @@ operator_lookup = {
 }
 
 
+# Diagnostics collected by collect_diagnostics, None when they are printed right away.
+_diagnostics_buffer: Optional[List[str]] = None
+
+
+def _print_diagnostic(line: str) -> None:
+    if _diagnostics_buffer is None:
+        print(line)
+    else:
+        _diagnostics_buffer.append(f"{line}\n")
+
+
+@contextlib.contextmanager
+def collect_diagnostics() -> Iterator[List[str]]:
+    # Collects the errors and warnings printed within the block into the yielded list of lines instead of
+    # printing them, so the caller decides when they are written, for example in order from several processes.
+    global _diagnostics_buffer
+    outer_buffer = _diagnostics_buffer
+    lines: List[str] = []
+    _diagnostics_buffer = lines
+    try:
+        yield lines
+    finally:
+        _diagnostics_buffer = outer_buffer
+
+
+def write_diagnostics(lines: List[str]) -> None:
+    """Write diagnostic lines gathered by collect_diagnostics to stdout at once."""
+    if _diagnostics_buffer is not None:
+        _diagnostics_buffer.extend(lines)
+    elif len(lines):
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+
+
 def print_error(error: str, state: State) -> None:
-    print(f'{STYLES["red"]}{STYLES["bold"]}ERROR:{STYLES["regular"]} {error}{STYLES["reset"]}')
+    _print_diagnostic(f"{ERROR_PREFIX}{error}{STYLE_RESET}")
     state.num_errors += 1
 
 
 def print_warning(warning: str, state: State) -> None:
-    print(f'{STYLES["yellow"]}{STYLES["bold"]}WARNING:{STYLES["regular"]} {warning}{STYLES["reset"]}')
+    _print_diagnostic(f"{WARNING_PREFIX}{warning}{STYLE_RESET}")
     state.num_warnings += 1
 
 
+class _StateCache:
+    # Lookups derived from the classes of a state. They only hold for the classes they were built from,
+    # so the lookups are dropped once classes are added or the classes are sorted into a new mapping.
+    __slots__ = ("classes", "num_classes", "lookups")
+
+    def __init__(self, state: State) -> None:
+        self.classes = state.classes
+        self.num_classes = len(state.classes)
+        self.lookups: Dict[str, Dict[Any, Any]] = {}
+
+
+# Keyed weakly so a state and its lookups are freed together.
+_state_caches: "weakref.WeakKeyDictionary[State, _StateCache]" = weakref.WeakKeyDictionary()
+
+
+def get_state_cache(state: State, name: str) -> Dict[Any, Any]:
+    """Get the named cache of lookups for a state, emptied whenever the classes of the state change."""
+    cache = _state_caches.get(state)
+    if cache is None or cache.classes is not state.classes or cache.num_classes != len(state.classes):
+        cache = _StateCache(state)
+        _state_caches[state] = cache
+
+    lookups = cache.lookups.get(name)
+    if lookups is None:
+        lookups = cache.lookups[name] = {}
+    return lookups
+
+
+# Links are built from the url and title alone, and the same docs pages are linked from many descriptions.
+@functools.lru_cache(maxsize=None)
 def make_link(url: str, title: str) -> str:
     match = GODOT_DOCS_PATTERN.search(url)
     if match:
@@ -99,6 +256,28 @@ def make_link(url: str, title: str) -> str:
 
 
 def make_enum(t: str, is_bitfield: bool, state: State) -> str:
+    enum_links = get_state_cache(state, "enum_links")
+    key = (t, is_bitfield, state.current_class)
+    resolved_link = enum_links.get(key)
+    if resolved_link is None:
+        resolved_link = enum_links[key] = _get_enum_link(t, is_bitfield, state.current_class, state)
+    c, e, enum_link = resolved_link
+
+    if enum_link is not None:
+        if is_bitfield and not state.classes[c].enums[e].is_bitfield:
+            print_error(f'{state.current_class}.xml: Enum "{t}" is not bitfield.', state)
+        return enum_link
+
+    # Don't fail for `Vector3.Axis`, as this enum is a special case which is expected not to be resolved.
+    if f"{c}.{e}" != "Vector3.Axis":
+        print_error(f'{state.current_class}.xml: Unresolved enum "{t}".', state)
+
+    return t
+
+
+# Enums and types are resolved for nearly every member, so make_enum and make_type cache the links per state.
+# Errors are printed by the callers on every lookup, so only the resolution itself is cached.
+def _get_enum_link(t: str, is_bitfield: bool, current_class: str, state: State) -> Tuple[str, str, Optional[str]]:
     p = t.find(".")
     if p >= 0:
         c = t[0:p]
@@ -108,27 +287,34 @@ def make_enum(t: str, is_bitfield: bool, state: State) -> str:
             c = "@GlobalScope"
             e = "Variant." + e
     else:
-        c = state.current_class
+        c = current_class
         e = t
         if c in state.classes and e not in state.classes[c].enums:
             c = "@GlobalScope"
 
     if c in state.classes and e in state.classes[c].enums:
         if is_bitfield:
-            if not state.classes[c].enums[e].is_bitfield:
-                print_error(f'{state.current_class}.xml: Enum "{t}" is not bitfield.', state)
-            return f"<xref href=\"{c}.{e}\"></xref>"
-        else:
-            return f"<xref href=\"{e}\"></xref>"
-
-    # Don't fail for `Vector3.Axis`, as this enum is a special case which is expected not to be resolved.
-    if f"{c}.{e}" != "Vector3.Axis":
-        print_error(f'{state.current_class}.xml: Unresolved enum "{t}".', state)
+            return c, e, f"<xref href=\"{c}.{e}\"></xref>"
+        return c, e, f"<xref href=\"{e}\"></xref>"
 
-    return t
+    return c, e, None
 
 
 def make_type(klass: str, state: State) -> str:
+    type_links = get_state_cache(state, "type_links")
+    if klass in type_links:
+        type_link = type_links[klass]
+    else:
+        type_link = type_links[klass] = _get_type_link(klass, state)
+    if type_link is not None:
+        return type_link
+
+    link_type = klass[:-2] if klass.endswith("[]") else klass
+    print_error(f'{state.current_class}.xml: Unresolved type "{link_type}".', state)
+    return f"``{klass}``"
+
+
+def _get_type_link(klass: str, state: State) -> Optional[str]:
     if klass.find("*") != -1:  # Pointer, ignore
         return f"``{klass}``"
 
@@ -146,43 +332,110 @@ def make_type(klass: str, state: State) -> str:
     if klass == "void":
         return "void"
 
-    print_error(f'{state.current_class}.xml: Unresolved type "{link_type}".', state)
-    if is_array:
-        return f"``{link_type}[]``"
-    return f"``{link_type}``"
+    return None
 
 
 def full_type_name(type_name: str, state: State) -> str:
+    # The same few types are looked up for nearly every member, so results are cached per state.
+    full_type_names = get_state_cache(state, "full_type_names")
+    key = (type_name, state.current_class)
+    full_name = full_type_names.get(key)
+    if full_name is None:
+        full_name = full_type_names[key] = _full_type_name(type_name, state.current_class, state)
+    return full_name
+
+
+def _full_type_name(type_name: str, current_class: str, state: State) -> str:
     if type_name in state.classes:
         return type_name
 
-    for enum_name, _ in state.classes[state.current_class].enums.items():
-        if enum_name == type_name:
-            return f"{state.current_class}.{enum_name}"
+    if type_name in state.classes[current_class].enums:
+        return f"{current_class}.{type_name}"
 
-    for class_name, class_def in state.classes.items():
-        for enum_name, _ in class_def.enums.items():
-            if enum_name == type_name:
-                return f"{class_name}.{enum_name}"
+    enum_class_name = _get_enum_classes(state).get(type_name)
+    if enum_class_name is not None:
+        return f"{enum_class_name}.{type_name}"
 
     return type_name
 
 
-def is_in_tagset(tag_text: str, tagset: List[str]) -> bool:
-    for tag in tagset:
-        # Complete match.
-        if tag_text == tag:
-            return True
-        # Tag with arguments.
-        if tag_text.startswith(tag + " "):
-            return True
-        # Tag with arguments, special case for [url], [color], and [font].
-        if tag_text.startswith(tag + "="):
-            return True
-
-    return False
-
-
+# Maps each enum name to the first class, in class order, that defines an enum with that name.
+# Built once for the classes of a state, sorting or adding classes rebuilds it.
+def _get_enum_classes(state: State) -> Dict[str, str]:
+    class_indexes = get_state_cache(state, "class_indexes")
+    enum_classes = class_indexes.get("enum_classes")
+    if enum_classes is None:
+        enum_classes = class_indexes["enum_classes"] = {}
+        for class_name, class_def in state.classes.items():
+            for enum_name in class_def.enums:
+                enum_classes.setdefault(enum_name, class_name)
+    return enum_classes
+
+
+# Maps each member name of a class to the first kind of member it names, in the order
+# inline code is checked against them, with enum values last. Built once per class of a state.
+def _get_member_kinds(class_def: ClassDef, state: State) -> Dict[str, str]:
+    class_member_kinds = get_state_cache(state, "member_kinds")
+    member_kinds = class_member_kinds.get(class_def)
+    if member_kinds is not None:
+        return member_kinds
+
+    member_kinds = class_member_kinds[class_def] = {}
+    for members, kind in (
+        (class_def.methods, "method"),
+        (class_def.constructors, "constructor"),
+        (class_def.operators, "operator"),
+        (class_def.properties, "member"),
+        (class_def.signals, "signal"),
+        (class_def.annotations, "annotation"),
+        (class_def.theme_items, "theme property"),
+        (class_def.constants, "constant"),
+    ):
+        for name in members:
+            member_kinds.setdefault(name, kind)
+
+    for enum in class_def.enums.values():
+        for name in enum.values:
+            member_kinds.setdefault(name, "enum value")
+
+    return member_kinds
+
+
+# Names of the constants and enum values of a class, constant references may name either.
+def _get_constant_names(class_def: ClassDef, state: State) -> AbstractSet[str]:
+    class_constant_names = get_state_cache(state, "constant_names")
+    constant_names = class_constant_names.get(class_def)
+    if constant_names is None:
+        names = set(class_def.constants)
+        for enum in class_def.enums.values():
+            names.update(enum.values)
+        constant_names = class_constant_names[class_def] = frozenset(names)
+    return constant_names
+
+
+# Finds the class that defines a constant or enum value, in the given class or, when searched, @GlobalScope.
+# A match in @GlobalScope takes precedence over the given class. Constant references repeat
+# across many descriptions, so the results are cached per state.
+def _find_constant_class(
+    target_name: str, class_def: ClassDef, search_global_scope: bool, state: State
+) -> Optional[str]:
+    constant_classes = get_state_cache(state, "constant_classes")
+    key = (target_name, class_def, search_global_scope)
+    if key in constant_classes:
+        return constant_classes[key]
+
+    constant_class_name = None
+    if search_global_scope and target_name in _get_constant_names(state.classes["@GlobalScope"], state):
+        constant_class_name = "@GlobalScope"
+    elif target_name in _get_constant_names(class_def, state):
+        constant_class_name = class_def.name
+    constant_classes[key] = constant_class_name
+    return constant_class_name
+
+
+# The same tags repeat throughout the docs, so each distinct tag is parsed once.
+# The returned TagState is shared and must not be modified.
+@functools.lru_cache(maxsize=None)
 def get_tag_and_args(tag_text: str) -> TagState:
     tag_name = tag_text
     arguments: str = ""
@@ -211,8 +464,10 @@ def get_tag_and_args(tag_text: str) -> TagState:
 
 
 def parse_link_target(link_target: str, state: State, context_name: str) -> List[str]:
-    if link_target.find(".") != -1:
-        return link_target.split(".")
+    if "." in link_target:
+        # Callers only use the class and member names and check whether anything follows them,
+        # so stop splitting after the second period.
+        return link_target.split(".", 2)
     else:
         return [state.current_class, link_target]
 
@@ -225,36 +480,53 @@ def format_context_name(context: Union[DefinitionBase, None]) -> str:
     return context_name
 
 
-def escape_rst(text: str, until_pos: int = -1) -> str:
-    # Escape \ character, otherwise it ends up as an escape character in rst
-    pos = 0
+def _escape_char(text: str, char: str, until_pos: int, skip_in_words: bool = False) -> str:
+    # Escapes each char found before until_pos, skip_in_words leaves chars followed by a letter or digit as they are.
+    if until_pos < 0:
+        if char not in text:
+            return text
+        # A negative until_pos counts from the end, escapes never move it so every char before it is escaped at once.
+        end_pos = max(0, len(text) + until_pos)
+        if skip_in_words:
+            # Keep the character after the limit so the lookahead can check it, only underscores skip words.
+            return WORD_END_UNDERSCORE_PATTERN.sub(r"\\_", text[:end_pos + 1]) + text[end_pos + 1:]
+        return text[:end_pos].replace(char, f"\\{char}") + text[end_pos:]
+
+    # A positive until_pos is an index into the text as it is escaped, so each escape moves the limit one
+    # character closer to the start of the original text. The result is built once instead of per escape.
+    parts: List[str] = []
+    start = 0
+    shift = 0
     while True:
-        pos = text.find("\\", pos, until_pos)
+        pos = text.find(char, start, until_pos - shift)
         if pos == -1:
             break
-        text = f"{text[:pos]}\\\\{text[pos + 1:]}"
-        pos += 2
+        if skip_in_words and text[pos + 1].isalnum():
+            parts.append(text[start:pos + 1])
+        else:
+            parts.append(f"{text[start:pos]}\\{char}")
+            shift += 1
+        start = pos + 1
+
+    if start == 0:
+        return text
+    parts.append(text[start:])
+    return "".join(parts)
+
+
+def escape_rst(text: str, until_pos: int = -1) -> str:
+    # Escape \ character, otherwise it ends up as an escape character in rst
+    if "\\" in text:
+        text = _escape_char(text, "\\", until_pos)
 
     # Escape * character to avoid interpreting it as emphasis
-    pos = 0
-    while True:
-        pos = text.find("*", pos, until_pos)
-        if pos == -1:
-            break
-        text = f"{text[:pos]}\\*{text[pos + 1:]}"
-        pos += 2
+    if "*" in text:
+        text = _escape_char(text, "*", until_pos)
 
     # Escape _ character at the end of a word to avoid interpreting it as an inline hyperlink
-    pos = 0
-    while True:
-        pos = text.find("_", pos, until_pos)
-        if pos == -1:
-            break
-        if not text[pos + 1].isalnum():  # don't escape within a snake_case word
-            text = f"{text[:pos]}\\_{text[pos + 1:]}"
-            pos += 2
-        else:
-            pos += 1
+    # don't escape within a snake_case word
+    if "_" in text:
+        text = _escape_char(text, "_", until_pos, True)
 
     return text
 
@@ -262,10 +534,11 @@ def escape_rst(text: str, until_pos: int = -1) -> str:
 def format_codeblock(
     tag_state: TagState, post_text: str, indent_level: int, state: State
 ) -> Union[Tuple[str, int], None]:
-    end_pos = post_text.find("[/" + tag_state.name + "]")
+    closing_tag = f"[/{tag_state.name}]"
+    end_pos = post_text.find(closing_tag)
     if end_pos == -1:
         print_error(
-            f"{state.current_class}.xml: Tag depth mismatch for [{tag_state.name}]: no closing [/{tag_state.name}].",
+            f"{state.current_class}.xml: Tag depth mismatch for [{tag_state.name}]: no closing {closing_tag}.",
             state,
         )
         return None
@@ -273,36 +546,19 @@ def format_codeblock(
     opening_formatted = tag_state.name
     if len(tag_state.arguments) > 0:
         opening_formatted += " " + tag_state.arguments
+    opening_tag = f"[{opening_formatted}]"
 
-    code_text = post_text[len(f"[{opening_formatted}]"):end_pos]
+    code_text = post_text[len(opening_tag):end_pos]
     post_text = post_text[end_pos:]
 
-    # Remove extraneous tabs
-    code_pos = 0
-    while True:
-        code_pos = code_text.find("\n", code_pos)
-        if code_pos == -1:
-            break
-
-        to_skip = 0
-        while code_pos + to_skip + 1 < len(code_text) and code_text[code_pos + to_skip + 1] == "\t":
-            to_skip += 1
-
-        if to_skip > indent_level:
+    # Remove extraneous tabs, code within the block is indented with spaces
+    for match in CODE_LINE_TABS_PATTERN.finditer(code_text):
+        if len(match.group(1)) > indent_level:
             print_error(
                 f"{state.current_class}.xml: Four spaces should be used for indentation within [{tag_state.name}].",
                 state,
             )
-
-        if len(code_text[code_pos + to_skip + 1:]) == 0:
-            code_text = f"{code_text[:code_pos]}\n"
-            code_pos += 1
-        else:
-            code_text = f"{code_text[:code_pos]}\n    {code_text[code_pos + to_skip + 1:]}"
-            code_pos += 5 - to_skip
-
-    # Remove extra indentation
-    code_text = code_text.replace("\n    ", "\n")
+    code_text = CODE_LINE_TABS_PATTERN.sub("\n", code_text)
 
     # Get language name for syntax highlighting
     lang_name = tag_state.name
@@ -312,111 +568,227 @@ def format_codeblock(
         lang_name = "gdscript"
 
     return (
-        f"\n[{opening_formatted}]```{lang_name}{code_text}```{post_text}",
-        len(f"\n[{opening_formatted}]{code_text}"))
+        f"\n{opening_tag}```{lang_name}{code_text}```{post_text}",
+        len(opening_tag) + len(code_text) + 1)
 
 
 def format_table(f: TextIO, data: List[Tuple[Optional[str], ...]], remove_empty_columns: bool = False) -> None:
     if len(data) == 0:
         return
 
-    f.write(".. table::\n")
-    f.write("   :widths: auto\n\n")
-
     # Calculate the width of each column first, we will use this information
     # to properly format RST-style tables.
-    column_sizes = [0] * len(data[0])
-    for row in data:
-        for i, text in enumerate(row):
-            text_length = len(text or "")
-            if text_length > column_sizes[i]:
-                column_sizes[i] = text_length
+    column_sizes = [max(len(text or "") for text in column) for column in itertools.zip_longest(*data)]
+    shown_columns = [i for i, size in enumerate(column_sizes) if size != 0 or not remove_empty_columns]
 
     # Each table row is wrapped in two separators, consecutive rows share the same separator.
     # All separators, or rather borders, have the same shape and content. We compose it once,
     # then reuse it.
+    # Content of each cell is padded by 1 on each side.
+    sep = "".join(["+" + "-" * (column_sizes[i] + 2) for i in shown_columns]) + "+\n"
 
-    sep = ""
-    for size in column_sizes:
-        if size == 0 and remove_empty_columns:
-            continue
-        sep += "+" + "-" * (size + 2)  # Content of each cell is padded by 1 on each side.
-    sep += "+\n"
-
-    # Draw the first separator.
-    f.write(f"   {sep}")
+    # Collect the whole table and write it at once rather than as many small writes.
+    # Start with the header and the first separator.
+    lines = [".. table::\n", "   :widths: auto\n\n", f"   {sep}"]
 
     # Draw each row and close it with a separator.
     for row in data:
-        row_text = "|"
-        for i, text in enumerate(row):
-            if column_sizes[i] == 0 and remove_empty_columns:
-                continue
-            row_text += f' {(text or "").ljust(column_sizes[i])} |'
-        row_text += "\n"
+        cells = "".join([f' {(row[i] or "").ljust(column_sizes[i])} |' for i in shown_columns if i < len(row)])
+        lines.append(f"   |{cells}\n")
+        lines.append(f"   {sep}")
 
-        f.write(f"   {row_text}")
-        f.write(f"   {sep}")
-
-    f.write("\n")
+    lines.append("\n")
+    f.write("".join(lines))
 
 
 def sanitize_operator_name(dirty_name: str, state: State) -> str:
-    clear_name = dirty_name.replace("operator ", "")
-    if clear_name in operator_lookup:
-        clear_name = operator_lookup[clear_name]
-    else:
-        clear_name = "xxx"
+    clear_name = operator_lookup.get(dirty_name.replace("operator ", ""))
+    if clear_name is None:
         print_error(f'Unsupported operator type "{dirty_name}", please add the missing rule.', state)
+        return "xxx"
 
     return clear_name
 
 
-def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
-    text: str,
-    context: DefinitionBase,
+def format_text_block(text: str, context: DefinitionBase, state: State) -> str:
+    # Stock phrases repeat across many members, so reuse earlier results for the same text, kept per state.
+    # The context only changes the diagnostics, except for the parameters a [code] tag may match.
+    parameter_names: Optional[AbstractSet[str]] = None
+    if isinstance(context, (MethodDef, SignalDef, AnnotationDef)):
+        parameter_names = context.parameter_names
+    key = (text, state.current_class, parameter_names)
+
+    cache = get_state_cache(state, "text_blocks")
+    if key in cache:
+        return cache[key]
+
+    diagnostics = (state.num_errors, state.num_warnings, state.script_language_parity_check.hit_count)
+    result = _format_text_block(text, context, state)
+
+    # Only cache clean results so errors and warnings are still reported for every member.
+    if diagnostics == (state.num_errors, state.num_warnings, state.script_language_parity_check.hit_count):
+        cache[key] = result
+    return result
+
+
+def _get_last_char(parts: List[str], text: str) -> str:
+    # Last character of the parts followed by the text, or an empty string if there is none.
+    if text:
+        return text[-1]
+    for part in reversed(parts):
+        if part:
+            return part[-1]
+    return ""
+
+
+def _find_all(text: str, sub: str) -> List[int]:
+    positions: List[int] = []
+    pos = text.find(sub)
+    while pos != -1:
+        positions.append(pos)
+        pos = text.find(sub, pos + len(sub))
+    return positions
+
+
+def _drop_last_char(parts: List[str]) -> None:
+    for i in range(len(parts) - 1, -1, -1):
+        if parts[i]:
+            parts[i] = parts[i][:-1]
+            return
+
+
+def _format_member_reference(
+    tag_name: str,
+    link_target: str,
+    class_xml: str,
+    context_name: str,
     state: State,
+    resolved_references: Dict[Tuple[str, str], str],
 ) -> str:
+    target_class_name, target_name, *rest = parse_link_target(link_target, state, context_name)
+    resolved = True
+    if len(rest) > 0:
+        print_error(
+            f'{class_xml}: Bad reference "{link_target}" in {context_name}.',
+            state,
+        )
+        resolved = False
+
+    # Default to the tag command name. This works by default for most tags,
+    # but method, member, and theme_item have special cases.
+    if target_class_name in state.classes:
+        class_def = state.classes[target_class_name]
+        members_attribute, member_kind = MEMBER_REFERENCE_KINDS[tag_name]
+
+        if tag_name == "constant":
+            # Also search in @GlobalScope as a last resort if no class was specified
+            constant_class_name = _find_constant_class(
+                target_name, class_def, "." not in link_target, state)
+            found = constant_class_name is not None
+            if constant_class_name is not None:
+                target_class_name = constant_class_name
+
+        else:
+            found = target_name in getattr(class_def, members_attribute)
+
+        if not found:
+            print_error(
+                f'{class_xml}: Unresolved {member_kind} reference ' +
+                f'"{link_target}" in {context_name}.',
+                state,
+            )
+            resolved = False
+
+    else:
+        print_error(
+            f'{class_xml}: Unresolved type reference ' +
+            f'"{target_class_name}" in method reference "{link_target}" in {context_name}.',
+            state,
+        )
+        resolved = False
+
+    tag_text = f"<xref href=\"{target_class_name}.{target_name}\"></xref>"
+
+    # References with errors are not remembered so every occurrence still reports its error.
+    if resolved:
+        resolved_references[(tag_name, link_target)] = tag_text
+    return tag_text
+
+
+def _format_line_breaks(text: str, state: State) -> Optional[str]:
     # Linebreak + tabs in the XML should become two line breaks unless in a "codeblock"
+    if not any(tag in text for tag in CODEBLOCK_OPENING_TAGS):
+        return LINE_BREAK_PATTERN.sub("\n\n", text)
+
+    # Finished text is collected in parts and joined once, text[start:] is what is left to format.
+    parts: List[str] = []
+    start = 0
     pos = 0
     while True:
         pos = text.find("\n", pos)
         if pos == -1:
             break
 
-        pre_text = text[:pos]
-        indent_level = 0
-        while pos + 1 < len(text) and text[pos + 1] == "\t":
-            pos += 1
-            indent_level += 1
-        post_text = text[pos + 1:]
+        post_pos = TABS_PATTERN.match(text, pos + 1).end()  # type: ignore
+        indent_level = post_pos - pos - 1
 
         # Handle codeblocks
-        if (
-            post_text.startswith("[codeblock]")
-            or post_text.startswith("[codeblock ")
-            or post_text.startswith("[gdscript]")
-            or post_text.startswith("[gdscript ")
-            or post_text.startswith("[csharp]")
-            or post_text.startswith("[csharp ")
-        ):
+        if text.startswith(CODEBLOCK_PREFIXES, post_pos):
+            post_text = text[post_pos:]
             tag_text = post_text[1:].split("]", 1)[0]
             tag_state = get_tag_and_args(tag_text)
             result = format_codeblock(tag_state, post_text, indent_level, state)
             if result is None:
-                return ""
-            text = f"{pre_text}{result[0]}"
-            pos += result[1] - indent_level
+                return None
+            parts.append(text[start:pos])
+            # Continue from within the formatted codeblock, the rest of the text follows it.
+            text = result[0]
+            start = 0
+            pos = result[1]
 
         # Handle normal text
         else:
-            text = f"{pre_text}\n\n{post_text}"
-            pos += 2 - indent_level
+            parts.append(text[start:pos])
+            parts.append("\n\n")
+            start = pos = post_pos
+
+    parts.append(text[start:])
+    return "".join(parts)
+
+
+def _format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
+    text: str,
+    context: DefinitionBase,
+    state: State,
+) -> str:
+    # Plain prose without any tags has no code blocks either, it only needs its line breaks and escapes.
+    if "[" not in text:
+        return escape_rst(LINE_BREAK_PATTERN.sub("\n\n", text))
+
+    # Most brief descriptions are a single line, so only look for line breaks when there are any.
+    if "\n" in text:
+        formatted_text = _format_line_breaks(text, state)
+        if formatted_text is None:
+            return ""
+        text = formatted_text
 
     next_brac_pos = text.find("[")
     text = escape_rst(text, next_brac_pos)
 
     context_name = format_context_name(context)
+    class_xml = f"{state.current_class}.xml"
+
+    # Member references that resolved without errors, keyed on tag name and target.
+    # The class and context are fixed for one text block so repeated references can reuse the xref.
+    resolved_references: Dict[Tuple[str, str], str] = {}
+
+    # Parameter names are gathered into a set when the definition is parsed, checked by [param] and [code].
+    parameter_names: Optional[AbstractSet[str]] = None
+    if isinstance(context, (MethodDef, SignalDef, AnnotationDef)):
+        parameter_names = context.parameter_names
+
+    # Positions of every [/url] in text, found in one pass the first time a [url] tag is handled.
+    url_close_positions: Optional[List[int]] = None
 
     # Handle [tags]
     inside_code = False
@@ -428,6 +800,10 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
     has_codeblocks_gdscript = False
     has_codeblocks_csharp = False
 
+    # Formatted text is collected in parts and joined once at the end, text[start:] is still unformatted.
+    # Positions in text are never shifted by formatting, so lookaheads for closing tags read the source text.
+    parts: List[str] = []
+    start = 0
     pos = 0
     tag_depth = 0
     while True:
@@ -439,8 +815,8 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
         if endq_pos == -1:
             break
 
-        pre_text = text[:pos]
-        post_text = text[endq_pos + 1:]
+        pre_text = text[start:pos]
+        post_pos = endq_pos + 1
         tag_text = text[pos + 1:endq_pos]
 
         # Tag is a reference to a class.
@@ -461,16 +837,19 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                 # Exiting codeblocks and inline code tags.
 
                 if tag_state.closing and tag_state.name == inside_code_tag:
-                    if is_in_tagset(tag_state.name, RESERVED_CODEBLOCK_TAGS):
+                    if tag_state.name in CODEBLOCK_TAGS:
                         tag_text = ""
                         tag_depth -= 1
                         inside_code = False
                         ignore_code_warnings = False
                         # Strip newline if the tag was alone on one
-                        if pre_text[-1] == "\n":
-                            pre_text = pre_text[:-1]
+                        if _get_last_char(parts, pre_text) == "\n":
+                            if pre_text:
+                                pre_text = pre_text[:-1]
+                            else:
+                                _drop_last_char(parts)
 
-                    elif is_in_tagset(tag_state.name, ["code"]):
+                    elif tag_state.name in CODE_TAGS:
                         tag_text = "``"
                         tag_depth -= 1
                         inside_code = False
@@ -479,7 +858,7 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                 else:
                     if not ignore_code_warnings and tag_state.closing:
                         print_warning(
-                            f'{state.current_class}.xml: Found a code string ' +
+                            f'{class_xml}: Found a code string ' +
                             f'that looks like a closing tag "[{tag_state.raw}]" ' +
                             f'in {context_name}. {code_warning_if_intended_string}',
                             state,
@@ -487,6 +866,19 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
 
                     tag_text = f"[{tag_text}]"
 
+            # Formatting directives that wrap text, these are the most common tags so they are checked first.
+            elif tag_state.name in PAIRED_FORMATTING_TAGS:
+                opening_text, closing_text = PAIRED_FORMATTING_TAGS[tag_state.name]
+                if tag_state.closing:
+                    tag_depth -= 1
+                    tag_text = closing_text
+                else:
+                    tag_depth += 1
+                    tag_text = opening_text
+
+            elif tag_state.name in ESCAPED_CHARACTER_TAGS:
+                tag_text = ESCAPED_CHARACTER_TAGS[tag_state.name]
+
             # Entering codeblocks and inline code tags.
 
             elif tag_state.name == "codeblocks":
@@ -510,13 +902,13 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                     tag_text = ""
                     inside_code_tabs = True
 
-            elif is_in_tagset(tag_state.name, RESERVED_CODEBLOCK_TAGS):
+            elif tag_state.name in CODEBLOCK_TAGS:
                 tag_depth += 1
 
                 if tag_state.name == "gdscript":
                     if not inside_code_tabs:
                         print_error(
-                            f"{state.current_class}.xml: GDScript code block is " +
+                            f"{class_xml}: GDScript code block is " +
                             f"used outside of [codeblocks] in {context_name}.",
                             state,
                         )
@@ -526,7 +918,7 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                 elif tag_state.name == "csharp":
                     if not inside_code_tabs:
                         print_error(
-                            f"{state.current_class}.xml: C# code block is " +
+                            f"{class_xml}: C# code block is " +
                             f"used outside of [codeblocks] in {context_name}.",
                             state,
                         )
@@ -541,28 +933,28 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                         state,
                     )
 
-                    if "lang=text" in tag_state.arguments.split(" "):
+                    if "lang=text" in tag_state.options:
                         tag_text = "\n# [text](#tab/text)\n"
                     else:
                         tag_text = ""
 
                 inside_code = True
                 inside_code_tag = tag_state.name
-                ignore_code_warnings = "skip-lint" in tag_state.arguments.split(" ")
+                ignore_code_warnings = "skip-lint" in tag_state.options
 
-            elif is_in_tagset(tag_state.name, ["code"]):
+            elif tag_state.name in CODE_TAGS:
                 tag_text = "``"
                 tag_depth += 1
 
                 inside_code = True
                 inside_code_tag = "code"
-                ignore_code_warnings = "skip-lint" in tag_state.arguments.split(" ")
+                ignore_code_warnings = "skip-lint" in tag_state.options
 
                 if not ignore_code_warnings:
                     endcode_pos = text.find("[/code]", endq_pos + 1)
                     if endcode_pos == -1:
                         print_error(
-                            f"{state.current_class}.xml: Tag depth mismatch for " +
+                            f"{class_xml}: Tag depth mismatch for " +
                             f"[code]: no closing [/code] in {context_name}.",
                             state,
                         )
@@ -575,7 +967,7 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
 
                     if inside_code_text in state.classes:
                         print_warning(
-                            f'{state.current_class}.xml: Found a code string ' +
+                            f'{class_xml}: Found a code string ' +
                             f'"{inside_code_text}" that matches one of the known ' +
                             f'classes in {context_name}. {code_warning_if_intended_string}',
                             state,
@@ -585,383 +977,156 @@ def format_text_block(  # noqa: C901 # TODO: Unwrap and fix this function!
                     if len(rest) == 0 and target_class_name in state.classes:
                         class_def = state.classes[target_class_name]
 
-                        if target_name in class_def.methods:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} method in ' +
-                                f'{context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.constructors:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} constructor ' +
-                                f'in {context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.operators:
+                        member_kind = _get_member_kinds(class_def, state).get(target_name)
+                        if member_kind is not None:
                             print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
+                                f'{class_xml}: Found a code string ' +
                                 f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} operator in ' +
+                                f'{target_class_name}.{target_name} {member_kind} in ' +
                                 f'{context_name}. {code_warning_if_intended_string}',
                                 state,
                             )
 
-                        elif target_name in class_def.properties:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} member in ' +
-                                f'{context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.signals:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} signal in ' +
-                                f'{context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.annotations:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} annotation ' +
-                                f'in {context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.theme_items:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} theme property ' +
-                                f'in {context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        elif target_name in class_def.constants:
-                            print_warning(
-                                f'{state.current_class}.xml: Found a code string ' +
-                                f'"{inside_code_text}" that matches the ' +
-                                f'{target_class_name}.{target_name} constant in ' +
-                                f'{context_name}. {code_warning_if_intended_string}',
-                                state,
-                            )
-
-                        else:
-                            for enum in class_def.enums.values():
-                                if target_name in enum.values:
-                                    print_warning(
-                                        f'{state.current_class}.xml: Found a code ' +
-                                        f'string "{inside_code_text}" that matches ' +
-                                        f'the {target_class_name}.{target_name} enum ' +
-                                        f'value in {context_name}. {code_warning_if_intended_string}',
-                                        state,
-                                    )
-                                    break
-
-                    valid_param_context = isinstance(context, (MethodDef, SignalDef, AnnotationDef))
-                    if valid_param_context:
-                        context_params: List[ParameterDef] = context.parameters  # type: ignore
-                        for param_def in context_params:
-                            if param_def.name == inside_code_text:
-                                print_warning(
-                                    f'{state.current_class}.xml: Found a code string ' +
-                                    f'"{inside_code_text}" that matches one of the parameters ' +
-                                    f'in {context_name}. {code_warning_if_intended_string}',
-                                    state,
-                                )
-                                break
+                    if parameter_names is not None and inside_code_text in parameter_names:
+                        print_warning(
+                            f'{class_xml}: Found a code string ' +
+                            f'"{inside_code_text}" that matches one of the parameters ' +
+                            f'in {context_name}. {code_warning_if_intended_string}',
+                            state,
+                        )
 
             # Cross-references to items in this or other class documentation pages.
-            elif is_in_tagset(tag_state.name, RESERVED_CROSSLINK_TAGS):
+            elif tag_state.name in CROSSLINK_TAGS:
                 link_target: str = tag_state.arguments
 
                 if link_target == "":
                     print_error(
-                        f'{state.current_class}.xml: Empty cross-reference link "[{tag_state.raw}]" in {context_name}.',
+                        f'{class_xml}: Empty cross-reference link "[{tag_state.raw}]" in {context_name}.',
                         state,
                     )
                     tag_text = ""
                 else:
-                    if (
-                        tag_state.name == "method"
-                        or tag_state.name == "constructor"
-                        or tag_state.name == "operator"
-                        or tag_state.name == "member"
-                        or tag_state.name == "signal"
-                        or tag_state.name == "annotation"
-                        or tag_state.name == "theme_item"
-                        or tag_state.name == "constant"
-                    ):
-                        target_class_name, target_name, *rest = parse_link_target(link_target, state, context_name)
-                        if len(rest) > 0:
-                            print_error(
-                                f'{state.current_class}.xml: Bad reference "{link_target}" in {context_name}.',
-                                state,
-                            )
-
-                        # Default to the tag command name. This works by default for most tags,
-                        # but method, member, and theme_item have special cases.
-                        if target_class_name in state.classes:
-                            class_def = state.classes[target_class_name]
-
-                            if tag_state.name == "method":
-                                if target_name not in class_def.methods:
-                                    print_error(
-                                        f'{state.current_class}.xml: Unresolved method ' +
-                                        f'reference "{link_target}" in {context_name}.',
-                                        state,
-                                    )
-
-                            elif tag_state.name == "constructor" and target_name not in class_def.constructors:
-                                print_error(
-                                    f'{state.current_class}.xml: Unresolved constructor ' +
-                                    f'reference "{link_target}" in {context_name}.',
-                                    state,
-                                )
-
-                            elif tag_state.name == "operator" and target_name not in class_def.operators:
-                                print_error(
-                                    f'{state.current_class}.xml: Unresolved operator reference ' +
-                                    f'"{link_target}" in {context_name}.',
-                                    state,
-                                )
-
-                            elif tag_state.name == "member":
-                                if target_name not in class_def.properties:
-                                    print_error(
-                                        f'{state.current_class}.xml: Unresolved member ' +
-                                        f'reference "{link_target}" in {context_name}.',
-                                        state,
-                                    )
-
-                            elif tag_state.name == "signal" and target_name not in class_def.signals:
-                                print_error(
-                                    f'{state.current_class}.xml: Unresolved signal reference ' +
-                                    f'"{link_target}" in {context_name}.',
-                                    state,
-                                )
-
-                            elif tag_state.name == "annotation" and target_name not in class_def.annotations:
-                                print_error(
-                                    f'{state.current_class}.xml: Unresolved annotation ' +
-                                    f'reference "{link_target}" in {context_name}.',
-                                    state,
-                                )
-
-                            elif tag_state.name == "theme_item":
-                                if target_name not in class_def.theme_items:
-                                    print_error(
-                                        f'{state.current_class}.xml: Unresolved theme '
-                                        f'property reference "{link_target}" in {context_name}.',
-                                        state,
-                                    )
-
-                            elif tag_state.name == "constant":
-                                found = False
-
-                                # Search in the current class
-                                search_class_defs = [class_def]
-
-                                if link_target.find(".") == -1:
-                                    # Also search in @GlobalScope as a last resort if no class was specified
-                                    search_class_defs.append(state.classes["@GlobalScope"])
-
-                                for search_class_def in search_class_defs:
-                                    if target_name in search_class_def.constants:
-                                        target_class_name = search_class_def.name
-                                        found = True
-
-                                    else:
-                                        for enum in search_class_def.enums.values():
-                                            if target_name in enum.values:
-                                                target_class_name = search_class_def.name
-                                                found = True
-                                                break
-
-                                if not found:
-                                    print_error(
-                                        f'{state.current_class}.xml: Unresolved constant reference ' +
-                                        f'"{link_target}" in {context_name}.',
-                                        state,
-                                    )
-
+                    if tag_state.name in MEMBER_REFERENCE_KINDS:
+                        reference_key = (tag_state.name, link_target)
+                        cached_text = resolved_references.get(reference_key)
+                        if cached_text is not None:
+                            tag_text = cached_text
                         else:
-                            print_error(
-                                f'{state.current_class}.xml: Unresolved type reference ' +
-                                f'"{target_class_name}" in method reference "{link_target}" in {context_name}.',
-                                state,
-                            )
-
-                        tag_text = f"<xref href=\"{target_class_name}.{target_name}\"></xref>"
+                            tag_text = _format_member_reference(
+                                tag_state.name, link_target, class_xml, context_name, state, resolved_references)
 
                     elif tag_state.name == "enum":
                         tag_text = make_enum(link_target, False, state)
 
                     elif tag_state.name == "param":
-                        valid_param_context = isinstance(context, (MethodDef, SignalDef, AnnotationDef))
-                        if not valid_param_context:
+                        if parameter_names is None:
                             print_error(
-                                f'{state.current_class}.xml: Argument reference ' +
+                                f'{class_xml}: Argument reference ' +
                                 f'"{link_target}" used outside of method, signal, or ' +
                                 f'annotation context in {context_name}.',
                                 state,
                             )
-                        else:
-                            context_params: List[ParameterDef] = context.parameters  # type: ignore
-                            found = False
-                            for param_def in context_params:
-                                if param_def.name == link_target:
-                                    found = True
-                                    break
-                            if not found:
-                                print_error(
-                                    f'{state.current_class}.xml: Unresolved argument reference ' +
-                                    f'"{link_target}" in {context_name}.',
-                                    state,
-                                )
+                        elif link_target not in parameter_names:
+                            print_error(
+                                f'{class_xml}: Unresolved argument reference ' +
+                                f'"{link_target}" in {context_name}.',
+                                state,
+                            )
 
                         tag_text = f"``{link_target}``"
 
             # Formatting directives.
 
-            elif is_in_tagset(tag_state.name, ["url"]):
+            elif tag_state.name in URL_TAGS:
                 url_target = tag_state.arguments
 
                 if url_target == "":
                     print_error(
-                        f'{state.current_class}.xml: Misformatted [url] tag "[{tag_state.raw}]" in {context_name}.',
+                        f'{class_xml}: Misformatted [url] tag "[{tag_state.raw}]" in {context_name}.',
                         state,
                     )
                 else:
                     # Unlike other tags, URLs are handled in full here, as we need to extract
                     # the optional link title to use `make_link`.
-                    endurl_pos = text.find("[/url]", endq_pos + 1)
-                    if endurl_pos == -1:
+                    if url_close_positions is None:
+                        url_close_positions = _find_all(text, "[/url]")
+                    close_index = bisect.bisect_right(url_close_positions, endq_pos)
+                    if close_index == len(url_close_positions):
                         print_error(
-                            f"{state.current_class}.xml: Tag depth mismatch for " +
+                            f"{class_xml}: Tag depth mismatch for " +
                             f"[url]: no closing [/url] in {context_name}.",
                             state,
                         )
                         break
+                    endurl_pos = url_close_positions[close_index]
                     link_title = text[endq_pos + 1:endurl_pos]
                     tag_text = make_link(url_target, link_title)
 
-                    pre_text = text[:pos]
-                    post_text = text[endurl_pos + 6:]
-
-                    if pre_text and pre_text[-1] not in MARKUP_ALLOWED_PRECEDENT:
-                        pre_text += "\\ "
-                    if post_text and post_text[0] not in MARKUP_ALLOWED_SUBSEQUENT:
-                        post_text = "\\ " + post_text
-
-                    text = pre_text + tag_text + post_text
-                    pos = len(pre_text) + len(tag_text)
+                    post_pos = endurl_pos + 6
+                    # The escaped spaces around the link are appended as their own parts.
+                    last_char = _get_last_char(parts, pre_text)
+                    parts.append(pre_text)
+                    if last_char and last_char not in MARKUP_ALLOWED_PRECEDENT_CHARS:
+                        parts.append("\\ ")
+                    parts.append(tag_text)
+                    if post_pos < len(text) and text[post_pos] not in MARKUP_ALLOWED_SUBSEQUENT_CHARS:
+                        parts.append("\\ ")
+                    start = pos = post_pos
                     continue
 
             elif tag_state.name == "br":
                 # Make a new paragraph instead of a linebreak, rst is not so linebreak friendly
                 tag_text = "\n\n"
                 # Strip potential leading spaces
-                while post_text[0] == " ":
-                    post_text = post_text[1:]
-
-            elif tag_state.name == "center":
-                if tag_state.closing:
-                    tag_depth -= 1
-                else:
-                    tag_depth += 1
-                tag_text = ""
-
-            elif tag_state.name == "i":
-                if tag_state.closing:
-                    tag_depth -= 1
-                else:
-                    tag_depth += 1
-                tag_text = "*"
-
-            elif tag_state.name == "b":
-                if tag_state.closing:
-                    tag_depth -= 1
-                else:
-                    tag_depth += 1
-                tag_text = "**"
-
-            elif tag_state.name == "u":
-                if tag_state.closing:
-                    tag_depth -= 1
-                else:
-                    tag_depth += 1
-                tag_text = ""
-
-            elif tag_state.name == "lb":
-                tag_text = "["
-
-            elif tag_state.name == "rb":
-                tag_text = "]"
-
-            elif tag_state.name == "kbd":
-                tag_text = "`"
-                if tag_state.closing:
-                    tag_text = tag_text + "</kbd>"
-                    tag_depth -= 1
-                else:
-                    tag_text = "<kbd>" + tag_text
-                    tag_depth += 1
+                post_pos = SPACES_PATTERN.match(text, post_pos).end()  # type: ignore
 
             # Invalid syntax.
             else:
                 if tag_state.closing:
                     print_error(
-                        f'{state.current_class}.xml: Unrecognized closing tag "[{tag_state.raw}]" in {context_name}.',
+                        f'{class_xml}: Unrecognized closing tag "[{tag_state.raw}]" in {context_name}.',
                         state,
                     )
 
                     tag_text = f"[{tag_text}]"
                 else:
                     print_error(
-                        f'{state.current_class}.xml: Unrecognized opening tag "[{tag_state.raw}]" in {context_name}.',
+                        f'{class_xml}: Unrecognized opening tag "[{tag_state.raw}]" in {context_name}.',
                         state,
                     )
 
                     tag_text = f"``{tag_text}``"
 
-        next_brac_pos = post_text.find("[", 0)
-        iter_pos = 0
-        while not inside_code:
-            iter_pos = post_text.find("*", iter_pos, next_brac_pos)
-            if iter_pos == -1:
-                break
-            post_text = f"{post_text[:iter_pos]}\\*{post_text[iter_pos + 1:]}"
-            iter_pos += 2
-
-        iter_pos = 0
-        while not inside_code:
-            iter_pos = post_text.find("_", iter_pos, next_brac_pos)
-            if iter_pos == -1:
-                break
-            if not post_text[iter_pos + 1].isalnum():  # don't escape within a snake_case word
-                post_text = f"{post_text[:iter_pos]}\\_{post_text[iter_pos + 1:]}"
-                iter_pos += 2
+        parts.append(pre_text)
+        parts.append(tag_text)
+        start = pos = post_pos
+
+        # Escape the text up to the next tag, it is moved into parts so the next tag is found right away.
+        if not inside_code:
+            next_brac_pos = text.find("[", post_pos)
+            # Escaping never reaches the bracket of the next tag or the last character of the text.
+            escape_end_pos = len(text) - 1 if next_brac_pos == -1 else next_brac_pos
+            if text.find("*", post_pos, escape_end_pos) == -1 and text.find("_", post_pos, escape_end_pos) == -1:
+                # Nothing to escape, the text stays in text[start:] as it is.
+                pos = len(text) if next_brac_pos == -1 else next_brac_pos
+            elif next_brac_pos == -1:
+                post_text = _escape_char(text[post_pos:], "*", -1)
+                parts.append(_escape_char(post_text, "_", -1, True))
+                start = pos = len(text)
             else:
-                iter_pos += 1
+                # Keep the bracket so escaping can look one character past the text it escapes.
+                until_pos = next_brac_pos - post_pos
+                post_text = _escape_char(text[post_pos:next_brac_pos + 1], "*", until_pos)
+                post_text = _escape_char(post_text, "_", until_pos, True)
+                parts.append(post_text[:-1])
+                start = pos = next_brac_pos
 
-        text = pre_text + tag_text + post_text
-        pos = len(pre_text) + len(tag_text)
+    parts.append(text[start:])
+    text = "".join(parts)
 
     if tag_depth > 0:
         print_error(
-            f"{state.current_class}.xml: Tag depth mismatch: too many (or too few) open/close tags in {context_name}.",
+            f"{class_xml}: Tag depth mismatch: too many (or too few) open/close tags in {context_name}.",
             state,
         )
 
@@ -984,6 +1149,55 @@ def make_method_signature(
     xref_param_types: bool,
     state: State,
     sanitize: bool
+) -> str:
+    if xref_param_types:
+        params = [make_type(parameter.type_name.type_name, state) for parameter in definition.parameters]
+    else:
+        params = [parameter.type_name.type_name for parameter in definition.parameters]
+
+    if named_params:
+        params = [f"{type_name} {parameter.name}" for type_name, parameter in zip(params, definition.parameters)]
+
+    is_operator = definition.name.startswith("operator ")
+    out = definition.name
+    if is_operator:
+        out = sanitize_operator_name(out, state) if sanitize else out.replace("operator ", "")
+
+    return _format_signature(definition, out, params, spaces, is_operator)
+
+
+def make_method_signatures(
+    definition: Union[AnnotationDef, MethodDef, SignalDef],
+    state: State,
+    sanitize: bool
+) -> Tuple[str, str, str]:
+    """Make the short, spaced, and spaced with named parameters signatures of a definition in one pass.
+
+    Same as calling make_method_signature with (False, False, False, sanitize), (True, False, False, False),
+    and (True, True, False, False).
+    """
+    params = [parameter.type_name.type_name for parameter in definition.parameters]
+    named_params = [f"{type_name} {parameter.name}" for type_name, parameter in zip(params, definition.parameters)]
+
+    is_operator = definition.name.startswith("operator ")
+    name = definition.name
+    short_name = name
+    if is_operator:
+        name = name.replace("operator ", "")
+        short_name = sanitize_operator_name(definition.name, state) if sanitize else name
+
+    return (
+        _format_signature(definition, short_name, params, False, is_operator),
+        _format_signature(definition, name, params, True, is_operator),
+        _format_signature(definition, name, named_params, True, is_operator))
+
+
+def _format_signature(
+    definition: Union[AnnotationDef, MethodDef, SignalDef],
+    out: str,
+    params: List[str],
+    spaces: bool,
+    is_operator: bool
 ) -> str:
     qualifiers = None
     if isinstance(definition, (MethodDef, AnnotationDef)):
@@ -991,27 +1205,13 @@ def make_method_signature(
 
     always_include_parenthesis: bool = definition is MethodDef
     varargs = qualifiers is not None and "vararg" in qualifiers
-    params = []
-    for parameter in definition.parameters:
-        type_name = parameter.type_name.type_name
-        if xref_param_types:
-            type_name = make_type(parameter.type_name.type_name, state)
-
-        if named_params:
-            params.append(f"{type_name} {parameter.name}")
-        else:
-            params.append(type_name)
-
-    out = definition.name.replace("operator ", "")
-    if definition.name.startswith("operator ") and sanitize:
-        out = sanitize_operator_name(definition.name, state)
 
     sep = ", " if spaces else ","
     if varargs:
-        params += ["..."]
+        params = params + ["..."]
 
     if len(params):
-        if definition.name.startswith("operator ") and spaces:
+        if is_operator and spaces:
             out += " "
         out += f"({sep.join(params)})"
     elif always_include_parenthesis:
@@ -1021,38 +1221,13 @@ def make_method_signature(
 
 
 def get_method_qualifiers(definition: Union[AnnotationDef, MethodDef]):
-    out = ""
-    for qualifier in definition.qualifiers.split():
-        out += f"<abbr title=\"{get_qualifier_tooltip(qualifier)}\">{qualifier}</abbr>"
-    return out
+    return "".join(
+        f"<abbr title=\"{get_qualifier_tooltip(qualifier)}\">{qualifier}</abbr>"
+        for qualifier in definition.qualifiers.split())
 
 
 def get_qualifier_tooltip(qualifier: str):
-    virtual_msg = "This method should typically be overridden by the user to have any effect."
-    const_msg = "This method has no side effects. It doesn't modify any of the instance's member variables."
-    vararg_msg = "This method accepts any number of arguments after the ones described here."
-    constructor_msg = "This method is used to construct a type."
-    static_msg = "This method doesn't need an instance to be called, so it can be called directly using the class name."
-    operator_msg = "This method describes a valid operator to use with this type as left-hand operand."
-    bitfield_msg = "This value is an integer composed as a bitmask of the following flags."
-    void_msg = "No return value."
-
-    if qualifier == "virtual":
-        return virtual_msg
-    elif qualifier == "const":
-        return const_msg
-    elif qualifier == "vararg":
-        return vararg_msg
-    elif qualifier == "constructor":
-        return constructor_msg
-    elif qualifier == "static":
-        return static_msg
-    elif qualifier == "operator":
-        return operator_msg
-    elif qualifier == "bitfield":
-        return bitfield_msg
-    elif qualifier == "void":
-        return void_msg
+    return QUALIFIER_TOOLTIPS.get(qualifier)
 
 
 def make_setter_signature(class_def: ClassDef, property_def: PropertyDef, state: State) -> str:
@@ -1090,13 +1265,32 @@ def make_getter_signature(class_def: ClassDef, property_def: PropertyDef, state:
     return f"{ret_type} {signature}"
 
 
+def _iter_xml_files(path: str) -> Iterator[str]:
+    # Walk with os.scandir so directory checks use the cached entry type instead of a stat per entry.
+    # Files are yielded before subdirectories are visited, in the same order as os.walk.
+    subdirs: List[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not followed.
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(".xml"):
+                    yield entry.path
+    except OSError:
+        return
+
+    for subdir in subdirs:
+        yield from _iter_xml_files(subdir)
+
+
 def get_file_list(paths: List[str]) -> List[str]:
     file_list: List[str] = []
 
     for path in paths:
         if os.path.isdir(path):
-            for root, subdirs, files in os.walk(path):
-                file_list += (os.path.join(root, filename) for filename in files if filename.endswith(".xml"))
+            file_list.extend(_iter_xml_files(path))
         elif os.path.isfile(path):
             if not path.endswith(".xml"):
                 print(f'Got non-.xml file "{path}" in input, skipping.')
@@ -1106,29 +1300,83 @@ def get_file_list(paths: List[str]) -> List[str]:
     return file_list
 
 
-def read_xml_data(files: List[str]) -> Dict[str, Tuple[ET.Element, str]]:
-    classes: Dict[str, Tuple[ET.Element, str]] = {}
-    for cur_file in get_file_list(files):
-        tree = ET.parse(cur_file)
-        doc = tree.getroot()
-        name = doc.attrib["name"]
-        classes[name] = (doc, cur_file)
+def _get_xml_parser() -> "lxml_etree.XMLParser":
+    """Get the calling thread's lxml parser, creating it on first use."""
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        # Drop comments and processing instructions so lxml yields the same children as ElementTree.
+        # Keep libxml2's size limits and leave entities unresolved so untrusted docs can't pull in other files.
+        parser = lxml_etree.XMLParser(resolve_entities=False, remove_comments=True, remove_pis=True)
+        _parser_local.parser = parser
+    return parser
 
-    return classes
+
+def parse_xml_file(path: str) -> ET.Element:
+    if lxml_etree is not None:
+        return lxml_etree.parse(path, _get_xml_parser()).getroot()
+
+    return ET.parse(path).getroot()
+
+
+def iter_xml_data(file_list: List[str]) -> Iterator[Tuple[ET.Element, str]]:
+    """Parse xml files on a thread pool, yielding each root element and its path in file order."""
+    # Parsing happens in C and mostly waits on disk, so files can be read concurrently.
+    # Only a bounded window of files is parsed ahead of the caller so trees can be released as they are used.
+    max_workers = min(32, (os.cpu_count() or 1) * 2)
+    pending: Deque[Tuple["Future[ET.Element]", str]] = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for cur_file in file_list:
+            pending.append((executor.submit(parse_xml_file, cur_file), cur_file))
+            if len(pending) >= max_workers * 2:
+                future, path = pending.popleft()
+                yield future.result(), path
+
+        while pending:
+            future, path = pending.popleft()
+            yield future.result(), path
 
 
 def get_class_state_from_docs(paths: List[str]) -> State:
     files: List[str] = get_file_list(paths)
-    classes: Dict[str, Tuple[ET.Element, str]] = read_xml_data(files)
     state = State()
-    for name, data in classes.items():
+
+    # Classes are parsed as their files are read rather than after every tree is loaded.
+    # A later file with the same class name still replaces the earlier class definition.
+    for doc, cur_file in iter_xml_data(files):
         try:
-            state.parse_class(data[0], data[1])
+            state.parse_class(doc, cur_file)
         except Exception as e:
-            print_error(f"{name}.xml: Exception while parsing class: {e}", state)
+            print_error(f"{doc.attrib['name']}.xml: Exception while parsing class: {e}", state)
+
+        # Everything needed has been copied into the class definitions, release the element tree.
+        doc.clear()
     return state
 
 
+# Large streamed documents such as the toc and xrefmap are written through a bigger buffer to cut syscalls.
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def open_text_stream(path: str) -> TextIO:
+    """Open a utf-8 text file for streamed writing, line endings are kept as is."""
+    return open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE)
+
+
+def write_text_file(path: str, text: str) -> None:
+    """Write text to a file as utf-8 with a single write, line endings are kept as is."""
+    with open(path, "wb") as file:
+        file.write(text.encode("utf-8"))
+
+
+def get_filtered_classes(state: State, filepath_filter: str) -> List[Tuple[str, ClassDef]]:
+    """Get the classes whose xml filepath matches a filter pattern, or every class if the filter is empty."""
+    if not filepath_filter:
+        return list(state.classes.items())
+
+    pattern = re.compile(filepath_filter)
+    return [(name, class_def) for name, class_def in state.classes.items() if pattern.search(class_def.filepath)]
+
+
 def get_class_uid(class_def: ClassDef) -> str:
     return class_def.name
 
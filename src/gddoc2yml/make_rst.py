@@ -190,7 +190,7 @@ class State:
 
         inherits = class_root.get("inherits")
         if inherits is not None:
-            class_def.inherits = inherits
+            class_def.inherits = inherits.strip()
 
         class_def.deprecated = class_root.get("deprecated")
         class_def.experimental = class_root.get("experimental")
@@ -468,8 +468,13 @@ class TagState:
         self.arguments = arguments
         self.closing = closing
 
+        # The space separated options of the tag, such as skip-lint or lang=text.
+        self.options = frozenset(arguments.split(" ")) if arguments else frozenset()
+
 
 class TypeName:
+    __slots__ = ("type_name", "enum", "is_bitfield")
+
     def __init__(self, type_name: str, enum: Optional[str] = None, is_bitfield: bool = False) -> None:
         self.type_name = type_name
         self.enum = enum
@@ -489,6 +494,8 @@ class TypeName:
 
 
 class DefinitionBase:
+    __slots__ = ("definition_name", "name", "deprecated", "experimental")
+
     def __init__(
         self,
         definition_name: str,
@@ -501,6 +508,8 @@ class DefinitionBase:
 
 
 class PropertyDef(DefinitionBase):
+    __slots__ = ("type_name", "setter", "getter", "text", "default_value", "overrides")
+
     def __init__(
         self,
         name: str,
@@ -522,6 +531,8 @@ class PropertyDef(DefinitionBase):
 
 
 class ParameterDef(DefinitionBase):
+    __slots__ = ("type_name", "default_value")
+
     def __init__(self, name: str, type_name: TypeName, default_value: Optional[str]) -> None:
         super().__init__("parameter", name)
 
@@ -530,14 +541,19 @@ class ParameterDef(DefinitionBase):
 
 
 class SignalDef(DefinitionBase):
+    __slots__ = ("parameters", "parameter_names", "description")
+
     def __init__(self, name: str, parameters: List[ParameterDef], description: Optional[str]) -> None:
         super().__init__("signal", name)
 
         self.parameters = parameters
+        self.parameter_names = frozenset(parameter.name for parameter in parameters)
         self.description = description
 
 
 class AnnotationDef(DefinitionBase):
+    __slots__ = ("parameters", "parameter_names", "description", "qualifiers")
+
     def __init__(
         self,
         name: str,
@@ -548,11 +564,14 @@ class AnnotationDef(DefinitionBase):
         super().__init__("annotation", name)
 
         self.parameters = parameters
+        self.parameter_names = frozenset(parameter.name for parameter in parameters)
         self.description = description
         self.qualifiers = qualifiers
 
 
 class MethodDef(DefinitionBase):
+    __slots__ = ("return_type", "parameters", "parameter_names", "description", "qualifiers")
+
     def __init__(
         self,
         name: str,
@@ -565,11 +584,14 @@ class MethodDef(DefinitionBase):
 
         self.return_type = return_type
         self.parameters = parameters
+        self.parameter_names = frozenset(parameter.name for parameter in parameters)
         self.description = description
         self.qualifiers = qualifiers
 
 
 class ConstantDef(DefinitionBase):
+    __slots__ = ("value", "text", "is_bitfield")
+
     def __init__(self, name: str, value: str, text: Optional[str], bitfield: bool) -> None:
         super().__init__("constant", name)
 
@@ -579,6 +601,8 @@ class ConstantDef(DefinitionBase):
 
 
 class EnumDef(DefinitionBase):
+    __slots__ = ("type_name", "values", "is_bitfield")
+
     def __init__(self, name: str, type_name: TypeName, bitfield: bool) -> None:
         super().__init__("enum", name)
 
@@ -588,6 +612,8 @@ class EnumDef(DefinitionBase):
 
 
 class ThemeItemDef(DefinitionBase):
+    __slots__ = ("type_name", "data_name", "text", "default_value")
+
     def __init__(
         self, name: str, type_name: TypeName, data_name: str, text: Optional[str], default_value: Optional[str]
     ) -> None:
@@ -600,6 +626,12 @@ class ThemeItemDef(DefinitionBase):
 
 
 class ClassDef(DefinitionBase):
+    __slots__ = (
+        "class_group", "editor_class", "constants", "enums", "properties", "constructors", "methods", "operators",
+        "signals", "annotations", "theme_items", "inherits", "brief_description", "description", "tutorials",
+        "keywords", "filepath",
+    )
+
     def __init__(self, name: str) -> None:
         super().__init__("class", name)
 
@@ -1778,19 +1810,12 @@ RESERVED_CROSSLINK_TAGS = [
 ]
 
 
-def is_in_tagset(tag_text: str, tagset: List[str]) -> bool:
-    for tag in tagset:
-        # Complete match.
-        if tag_text == tag:
-            return True
-        # Tag with arguments.
-        if tag_text.startswith(tag + " "):
-            return True
-        # Tag with arguments, special case for [url], [color], and [font].
-        if tag_text.startswith(tag + "="):
-            return True
-
-    return False
+# Tag names are looked up in sets, tags never contain a space or an equals sign.
+# Parsed tag names are already cut at either, so they can be checked with a plain membership test.
+CODEBLOCK_TAGS = frozenset(RESERVED_CODEBLOCK_TAGS)
+CROSSLINK_TAGS = frozenset(RESERVED_CROSSLINK_TAGS)
+CODE_TAGS = frozenset(["code"])
+URL_TAGS = frozenset(["url"])
 
 
 def get_tag_and_args(tag_text: str) -> TagState:
@@ -1921,7 +1946,7 @@ def format_text_block(
                 # Exiting codeblocks and inline code tags.
 
                 if tag_state.closing and tag_state.name == inside_code_tag:
-                    if is_in_tagset(tag_state.name, RESERVED_CODEBLOCK_TAGS):
+                    if tag_state.name in CODEBLOCK_TAGS:
                         tag_text = ""
                         tag_depth -= 1
                         inside_code = False
@@ -1930,7 +1955,7 @@ def format_text_block(
                         if pre_text[-1] == "\n":
                             pre_text = pre_text[:-1]
 
-                    elif is_in_tagset(tag_state.name, ["code"]):
+                    elif tag_state.name in CODE_TAGS:
                         tag_text = "``"
                         tag_depth -= 1
                         inside_code = False
@@ -1969,7 +1994,7 @@ def format_text_block(
                     tag_text = "\n.. tabs::"
                     inside_code_tabs = True
 
-            elif is_in_tagset(tag_state.name, RESERVED_CODEBLOCK_TAGS):
+            elif tag_state.name in CODEBLOCK_TAGS:
                 tag_depth += 1
 
                 if tag_state.name == "gdscript":
@@ -1998,22 +2023,22 @@ def format_text_block(
                         state,
                     )
 
-                    if "lang=text" in tag_state.arguments.split(" "):
+                    if "lang=text" in tag_state.options:
                         tag_text = "\n.. code:: text\n"
                     else:
                         tag_text = "\n::\n"
 
                 inside_code = True
                 inside_code_tag = tag_state.name
-                ignore_code_warnings = "skip-lint" in tag_state.arguments.split(" ")
+                ignore_code_warnings = "skip-lint" in tag_state.options
 
-            elif is_in_tagset(tag_state.name, ["code"]):
+            elif tag_state.name in CODE_TAGS:
                 tag_text = "``"
                 tag_depth += 1
 
                 inside_code = True
                 inside_code_tag = "code"
-                ignore_code_warnings = "skip-lint" in tag_state.arguments.split(" ")
+                ignore_code_warnings = "skip-lint" in tag_state.options
                 escape_pre = True
 
                 if not ignore_code_warnings:
@@ -2109,7 +2134,7 @@ def format_text_block(
                                 break
 
             # Cross-references to items in this or other class documentation pages.
-            elif is_in_tagset(tag_state.name, RESERVED_CROSSLINK_TAGS):
+            elif tag_state.name in CROSSLINK_TAGS:
                 link_target: str = tag_state.arguments
 
                 if link_target == "":
@@ -2269,7 +2294,7 @@ def format_text_block(
 
             # Formatting directives.
 
-            elif is_in_tagset(tag_state.name, ["url"]):
+            elif tag_state.name in URL_TAGS:
                 url_target = tag_state.arguments
 
                 if url_target == "":
@@ -1,9 +1,14 @@
+import io
+import os
+import shutil
 import unittest
 import argparse
 import tempfile
 
+from contextlib import redirect_stderr, redirect_stdout
+from importlib.resources import files
 from unittest import TestCase, mock
-from src.gddoc2yml.gdxml2yml import main
+from src.gddoc2yml.gdxml2yml import _get_parser, main
 
 
 class TestConsole(TestCase):
@@ -12,9 +17,44 @@ class TestConsole(TestCase):
             tempfile.TemporaryDirectory() as output_dirname, \
             mock.patch(
                 'argparse.ArgumentParser.parse_args',
-                return_value=argparse.Namespace(path=[input_dirname], filter="", output=output_dirname)):
+                return_value=argparse.Namespace(path=[input_dirname], filter="", jobs=1, output=output_dirname)):
             main()
 
+    def test_jobs_must_be_positive(self):
+        parser = _get_parser()
+        for jobs in ["0", "-3"]:
+            with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+                parser.parse_args(["--jobs", jobs, "input", "output"])
+        assert parser.parse_args(["--jobs", "2", "input", "output"]).jobs == 2
+
+    def test_parallel_matches_serial(self):
+        xml_docs = [f for f in files("tests").joinpath("classes").iterdir() if f.is_file() and f.name.endswith(".xml")]
+        with tempfile.TemporaryDirectory() as input_dirname, \
+                tempfile.TemporaryDirectory() as serial_dirname, \
+                tempfile.TemporaryDirectory() as parallel_dirname:
+            for xml_doc in xml_docs:
+                shutil.copyfile(xml_doc, os.path.join(input_dirname, xml_doc.name))
+
+            logs = []
+            for jobs, output_dirname in [(1, serial_dirname), (2, parallel_dirname)]:
+                with mock.patch(
+                        'argparse.ArgumentParser.parse_args',
+                        return_value=argparse.Namespace(
+                            path=[input_dirname], filter="", jobs=jobs, output=output_dirname)), \
+                        redirect_stdout(io.StringIO()) as stdout:
+                    main()
+                logs.append(stdout.getvalue())
+
+            # Diagnostics from worker processes are written in class order, like a serial run.
+            self.assertEqual(logs[0], logs[1])
+
+            serial_files = sorted(os.listdir(serial_dirname))
+            self.assertEqual(serial_files, sorted(os.listdir(parallel_dirname)))
+            for filename in serial_files:
+                with open(os.path.join(serial_dirname, filename), encoding="utf-8") as serial, \
+                        open(os.path.join(parallel_dirname, filename), encoding="utf-8") as parallel:
+                    self.assertEqual(serial.read(), parallel.read(), filename)
+
 
 if __name__ == '__main__':
     unittest.main()
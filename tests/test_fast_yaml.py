@@ -0,0 +1,72 @@
+import io
+import unittest
+
+import yaml
+
+from src.gddoc2yml import _fast_yaml
+
+
+TRICKY_STRINGS = [
+    "",
+    "plain",
+    "T:Node",
+    "key: value",
+    "trailing ",
+    " leading",
+    "yes",
+    "null",
+    "~",
+    "1.0",
+    "0x1F",
+    "@GlobalScope",
+    "- dash",
+    "# comment",
+    "multi\nline\n\ttabbed",
+    "quote \" and back\\slash",
+    "unicode é   \x85 \x7f \U0001F600",
+]
+
+
+class TestFastYaml(unittest.TestCase):
+    def test_items_round_trip(self):
+        items = [
+            {
+                "uid": value,
+                "langs": ("gdscript", "csharp"),
+                "syntax": {"content": value, "parameters": [], "return": {"type": value}},
+            }
+            for value in TRICKY_STRINGS
+        ]
+        references = [{"uid": value, "name": value} for value in TRICKY_STRINGS]
+
+        document = _fast_yaml.format_items(items, references)
+        expected_items = [{**item, "langs": list(item["langs"])} for item in items]
+        self.assertEqual(yaml.safe_load(document), {"items": expected_items, "references": references})
+
+    def test_refmap_round_trip(self):
+        references = [{"uid": value, "href": f"classes/class_{value}.html#{value}"} for value in TRICKY_STRINGS]
+
+        file = io.StringIO()
+        _fast_yaml.dump_refmap("https://docs.godotengine.org/en/stable/", references, file)
+        self.assertEqual(
+            yaml.safe_load(file.getvalue()),
+            {"baseUrl": "https://docs.godotengine.org/en/stable/", "sorted": True, "references": references})
+
+    def test_toc_matches_pyyaml(self):
+        classes = [
+            {"uid": "Node", "name": "node", "items": [{"uid": "Node.ProcessMode", "name": "ProcessMode"}]},
+            {"uid": "Object", "name": "object"},
+        ]
+
+        file = io.StringIO()
+        _fast_yaml.dump_toc(classes, file)
+        self.assertEqual(file.getvalue(), yaml.safe_dump(classes, default_flow_style=False, sort_keys=True))
+
+    def test_empty_toc(self):
+        file = io.StringIO()
+        _fast_yaml.dump_toc([], file)
+        self.assertEqual(yaml.safe_load(file.getvalue()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
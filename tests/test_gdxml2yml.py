@@ -1,11 +1,23 @@
+import contextlib
+import gc
+import io
 import os
 import tempfile
 import shutil
+import subprocess
+import sys
 import unittest
+import weakref
+import xml.etree.ElementTree as ET
 
 from importlib.resources import files
-from src.gddoc2yml import gdxml_helpers
-from src.gddoc2yml.make_rst import State
+from src.gddoc2yml import gdxml_helpers, gdxml2yml
+from src.gddoc2yml.make_rst import State, TypeName
+
+
+def _load_test_state() -> State:
+    # Tests run from the source tree, so the xml docs can be read in place.
+    return gdxml_helpers.get_class_state_from_docs([str(files("tests").joinpath("classes"))])
 
 
 class MyTestCase1(unittest.TestCase):
@@ -23,6 +35,356 @@ class MyTestCase1(unittest.TestCase):
             assert len(xml_files) > 0
             assert len(state.classes) == len(xml_files)
 
+    def test_parse_xml_file_skips_comments(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, "Commented.xml")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(
+                    '<?xml version="1.0" encoding="UTF-8" ?>\n'
+                    '<class name="Commented">\n'
+                    '\t<members>\n'
+                    '\t\t<!-- A comment between members. -->\n'
+                    '\t\t<member name="value" type="int" setter="set_value" getter="get_value">\n'
+                    '\t\t\tThe value.\n'
+                    '\t\t</member>\n'
+                    '\t</members>\n'
+                    '</class>\n')
+
+            state = State()
+            state.parse_class(gdxml_helpers.parse_xml_file(path), path)
+
+            assert state.num_errors == 0
+            assert list(state.classes["Commented"].properties) == ["value"]
+
+    def test_parse_xml_file_does_not_resolve_entities(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            secret_path = os.path.join(tmpdirname, "secret.txt")
+            with open(secret_path, "w", encoding="utf-8") as file:
+                file.write("file contents")
+            path = os.path.join(tmpdirname, "Entity.xml")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(
+                    '<?xml version="1.0" encoding="UTF-8" ?>\n'
+                    f'<!DOCTYPE class [<!ENTITY included SYSTEM "{secret_path}">]>\n'
+                    '<class name="Entity">\n'
+                    '\t<brief_description>&included;</brief_description>\n'
+                    '</class>\n')
+
+            try:
+                doc = gdxml_helpers.parse_xml_file(path)
+            except ET.ParseError:
+                # ElementTree refuses external entities outright.
+                return
+
+            assert "file contents" not in "".join(doc.itertext())
+
+    def test_iter_xml_data_does_not_resolve_entities(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            included_path = os.path.join(tmpdirname, "included.txt")
+            with open(included_path, "w", encoding="utf-8") as file:
+                file.write("file contents")
+            # Use more files than the parse window so every worker thread builds its own parser.
+            paths = []
+            for i in range((os.cpu_count() or 1) * 8):
+                path = os.path.join(tmpdirname, f"Entity{i}.xml")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(
+                        '<?xml version="1.0" encoding="UTF-8" ?>\n'
+                        f'<!DOCTYPE class [<!ENTITY included SYSTEM "{included_path}">]>\n'
+                        f'<class name="Entity{i}">\n'
+                        '\t<brief_description>&included;</brief_description>\n'
+                        '</class>\n')
+                paths.append(path)
+
+            try:
+                results = list(gdxml_helpers.iter_xml_data(paths))
+            except ET.ParseError:
+                # ElementTree refuses external entities outright.
+                return
+
+            for doc, _ in results:
+                assert "file contents" not in "".join(doc.itertext())
+
+    def test_get_file_list_recurses_into_directories(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            os.makedirs(os.path.join(tmpdirname, "nested", "deeper"))
+            nested_files = [os.path.join("nested", "B.xml"), os.path.join("nested", "deeper", "C.xml")]
+            for name in ["A.xml", "notes.txt", *nested_files]:
+                open(os.path.join(tmpdirname, name), "w").close()
+
+            file_list = gdxml_helpers.get_file_list([tmpdirname])
+
+            assert sorted(os.path.relpath(path, tmpdirname) for path in file_list) == ["A.xml", *nested_files]
+
+    def test_iter_xml_data_keeps_file_order(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            # Use more files than the parse window so results come from several batches of futures.
+            paths = []
+            for i in range((os.cpu_count() or 1) * 8):
+                path = os.path.join(tmpdirname, f"Class{i}.xml")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(f'<?xml version="1.0" encoding="UTF-8" ?>\n<class name="Class{i}" />\n')
+                paths.append(path)
+
+            results = list(gdxml_helpers.iter_xml_data(paths))
+
+            assert [path for _, path in results] == paths
+            assert [doc.attrib["name"] for doc, _ in results] == [f"Class{i}" for i in range(len(paths))]
+
+    def test_make_method_signatures(self):
+        state = _load_test_state()
+        for class_def in state.classes.values():
+            state.current_class = class_def.name
+            definitions = list(class_def.signals.values())
+            for method_list in [*class_def.methods.values(), *class_def.operators.values()]:
+                definitions.extend(method_list)
+
+            for definition in definitions:
+                for sanitize in [False, True]:
+                    expected = (
+                        gdxml_helpers.make_method_signature(definition, False, False, False, state, sanitize),
+                        gdxml_helpers.make_method_signature(definition, True, False, False, state, False),
+                        gdxml_helpers.make_method_signature(definition, True, True, False, state, False),
+                    )
+                    assert gdxml_helpers.make_method_signatures(definition, state, sanitize) == expected
+
+    def test_parameter_names_are_built_when_parsing(self):
+        state = _load_test_state()
+        for class_def in state.classes.values():
+            definitions = [*class_def.signals.values(), *class_def.annotations.values()]
+            for method_lists in [class_def.constructors, class_def.methods, class_def.operators]:
+                for method_list in method_lists.values():
+                    definitions.extend(method_list)
+
+            for definition in definitions:
+                assert definition.parameter_names == frozenset(parameter.name for parameter in definition.parameters)
+
+    def test_full_type_name(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+
+        assert gdxml_helpers.full_type_name("Node3D", state) == "Node3D"
+        assert gdxml_helpers.full_type_name("ProcessMode", state) == "Node.ProcessMode"
+        assert gdxml_helpers.full_type_name("ConnectFlags", state) == "Object.ConnectFlags"
+        assert gdxml_helpers.full_type_name("Unknown", state) == "Unknown"
+
+    def test_reference_yml_is_not_shared(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+        type_name = TypeName("ProcessMode")
+
+        first = gdxml2yml._make_reference_yml(type_name, state)
+        second = gdxml2yml._make_reference_yml(type_name, state)
+
+        assert first == second == {"uid": "Node.ProcessMode", "name": "Node.ProcessMode"}
+        assert first is not second
+
+    def test_state_caches_do_not_keep_states_alive(self):
+        states = [_load_test_state() for _ in range(3)]
+        for state in states:
+            state.current_class = "Node"
+            gdxml_helpers.full_type_name("ProcessMode", state)
+            gdxml_helpers.make_type("Node3D", state)
+            gdxml_helpers.make_enum("ProcessMode", False, state)
+            gdxml_helpers.format_text_block(
+                "See [constant OK], [code add_child] and [Node3D].", state.classes["Node"], state)
+            gdxml2yml._get_class_inheritance(state.classes["StaticBody3D"], state)
+            gdxml2yml._get_class_descendants("Object", state)
+
+        state_refs = [weakref.ref(state) for state in states]
+        del states, state
+        gc.collect()
+        assert all(state_ref() is None for state_ref in state_refs)
+
+    def test_full_type_name_follows_class_changes(self):
+        state = State()
+        state.parse_class(ET.fromstring('<class name="B"><constants>'
+                                        '<constant name="B_ONE" value="1" enum="Mode"/></constants></class>'), "")
+        state.current_class = "B"
+        assert gdxml_helpers.full_type_name("Other", state) == "Other"
+
+        # A class parsed after the first lookup is found.
+        state.parse_class(ET.fromstring('<class name="C"><constants>'
+                                        '<constant name="C_ONE" value="1" enum="Other"/></constants></class>'), "")
+        state.parse_class(ET.fromstring('<class name="A"><constants>'
+                                        '<constant name="A_ONE" value="1" enum="Mode"/></constants></class>'), "")
+        state.current_class = "B"
+        assert gdxml_helpers.full_type_name("Other", state) == "C.Other"
+        state.current_class = "C"
+        assert gdxml_helpers.full_type_name("Mode", state) == "B.Mode"
+
+        # Sorting the classes changes which class an enum name resolves to first.
+        state.sort_classes()
+        assert gdxml_helpers.full_type_name("Mode", state) == "A.Mode"
+
+    def test_make_type_follows_parsed_classes(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert gdxml_helpers.make_type("Resource", state) == "``Resource``"
+            assert gdxml_helpers.make_enum("Resource.CacheMode", False, state) == "Resource.CacheMode"
+        assert state.num_errors == 2
+
+        state.parse_class(ET.fromstring(
+            '<class name="Resource"><constants>'
+            '<constant name="CACHE_MODE_IGNORE" value="0" enum="CacheMode"/>'
+            '</constants></class>'), "")
+        state.current_class = "Node"
+        assert gdxml_helpers.make_type("Resource", state) == (
+            '<xref href="Resource" data-throw-if-not-resolved="false"></xref>')
+        assert gdxml_helpers.make_enum("Resource.CacheMode", False, state) == '<xref href="CacheMode"></xref>'
+        assert state.num_errors == 2
+
+    def test_escape_rst(self):
+        assert gdxml_helpers.escape_rst("a*b_ c\\d_e x") == "a\\*b\\_ c\\\\d_e x"
+        # Escaping stops before the first tag and never touches the last character.
+        text = "snake_case_ *bold* [b]x_ *y*[/b]"
+        assert gdxml_helpers.escape_rst(text, text.find("[")) == "snake_case\\_ \\*bold\\* [b]x_ *y*[/b]"
+        assert gdxml_helpers.escape_rst("end_") == "end_"
+
+    def test_format_table(self):
+        f = io.StringIO()
+        gdxml_helpers.format_table(f, [("int", None, "get_a"), ("Node", None, None)], remove_empty_columns=True)
+        assert f.getvalue() == (
+            ".. table::\n   :widths: auto\n\n"
+            "   +------+-------+\n"
+            "   | int  | get_a |\n"
+            "   +------+-------+\n"
+            "   | Node |       |\n"
+            "   +------+-------+\n\n")
+
+    def test_format_text_block_codeblock(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+        text = (
+            "First line.\n\t\t[codeblock]\n\t\tvar x = 1\n\t\tif x:\n\t\t    print(x)\n"
+            "\t\t[/codeblock]\n\t\tLast line.")
+
+        formatted = gdxml_helpers.format_text_block(text, state.classes["Node"], state)
+
+        assert formatted == "First line.\n```gdscript\nvar x = 1\nif x:\n    print(x)\n\n```\n\nLast line."
+        assert state.num_errors == 0
+
+    def test_format_text_block_line_break_tag(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+
+        formatted = gdxml_helpers.format_text_block("First.[br]  Second.[br]  ", state.classes["Node"], state)
+        assert formatted == "First.\n\nSecond.\n\n"
+
+    def test_format_text_block_reports_every_error(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+        context = state.classes["Node"]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            clean = [gdxml_helpers.format_text_block("Adds [b]bold[/b] text.", context, state) for _ in range(2)]
+            assert clean[0] == clean[1]
+            assert state.num_errors == 0
+
+            for _ in range(2):
+                gdxml_helpers.format_text_block("Bad [param missing] reference.", context, state)
+            assert state.num_errors == 2
+
+    def test_format_text_block_repeated_references(self):
+        state = _load_test_state()
+        state.current_class = "Node"
+        context = state.classes["Node"]
+
+        formatted = gdxml_helpers.format_text_block(
+            "Call [method add_child] then [method add_child].", context, state)
+        assert formatted == (
+            'Call <xref href="Node.add_child"></xref> then <xref href="Node.add_child"></xref>.')
+        assert state.num_errors == 0
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            gdxml_helpers.format_text_block("Bad [method missing] and [method missing].", context, state)
+        assert state.num_errors == 2
+
+    def test_collect_diagnostics(self):
+        state = State()
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            with gdxml_helpers.collect_diagnostics() as diagnostics:
+                gdxml_helpers.print_error("first", state)
+                gdxml_helpers.print_warning("second", state)
+            assert stdout.getvalue() == ""
+            assert diagnostics == [
+                f"{gdxml_helpers.ERROR_PREFIX}first{gdxml_helpers.STYLE_RESET}\n",
+                f"{gdxml_helpers.WARNING_PREFIX}second{gdxml_helpers.STYLE_RESET}\n"]
+
+            gdxml_helpers.write_diagnostics(diagnostics)
+            assert stdout.getvalue() == "".join(diagnostics)
+        assert (state.num_errors, state.num_warnings) == (1, 1)
+
+    def test_no_color_diagnostics(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "from src.gddoc2yml import gdxml_helpers; print(repr(gdxml_helpers.ERROR_PREFIX))"],
+            env={**os.environ, "NO_COLOR": "1"}, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == repr("ERROR: ")
+
+    def test_class_hierarchy(self):
+        state = _load_test_state()
+        state.sort_classes()
+
+        assert gdxml2yml._get_class_descendants("Object", state) == ["Node"]
+        assert gdxml2yml._get_class_descendants("StaticBody3D", state) == []
+        assert gdxml2yml._get_class_inheritance(state.classes["StaticBody3D"], state) == [
+            "PhysicsBody3D", "CollisionObject3D", "Node3D", "Node", "Object"]
+
+        # Callers may modify the returned list without changing the shared index.
+        gdxml2yml._get_class_descendants("Object", state).append("Other")
+        assert gdxml2yml._get_class_descendants("Object", state) == ["Node"]
+
+    def test_class_hierarchy_follows_parsed_classes(self):
+        state = _load_test_state()
+        assert gdxml2yml._get_class_descendants("StaticBody3D", state) == []
+        assert gdxml2yml._get_class_ancestors("AnimatableBody3D", state) == ()
+
+        # Classes parsed after a lookup are still found.
+        state.parse_class(ET.fromstring('<class name="AnimatableBody3D" inherits="StaticBody3D"/>'), "")
+        assert gdxml2yml._get_class_descendants("StaticBody3D", state) == ["AnimatableBody3D"]
+        assert gdxml2yml._get_class_inheritance(state.classes["AnimatableBody3D"], state) == [
+            "StaticBody3D", "PhysicsBody3D", "CollisionObject3D", "Node3D", "Node", "Object"]
+
+    def test_class_yml_member_order(self):
+        class_root = ET.fromstring(
+            '<class name="Members">'
+            '<constructors>'
+            '<constructor name="Members"><return type="Members" /><description>New.</description></constructor>'
+            '</constructors>'
+            '<methods>'
+            '<method name="get_a"><return type="int" /><description>A.</description></method>'
+            '<method name="get_b"><return type="int" /><description>B.</description></method>'
+            '</methods>'
+            '<operators>'
+            '<operator name="operator =="><return type="bool" /><param index="0" name="right" type="Members" />'
+            '<description>Equal.</description></operator>'
+            '</operators>'
+            '</class>')
+        state = State()
+        state.parse_class(class_root, "Members.xml")
+        state.current_class = "Members"
+
+        items, _ = gdxml2yml._get_class_yml("Members", state.classes["Members"], state)
+        class_yml, children = items[0], items[1:]
+
+        assert [(child["type"], child["id"]) for child in children] == [
+            ("Constructor", "Members"),
+            ("Method", "get_a"),
+            ("Method", "get_b"),
+            ("Operator", "eq(Members)"),
+        ]
+        assert class_yml["children"] == [child["uid"] for child in children]
+
+    def test_get_filtered_classes(self):
+        state = _load_test_state()
+        state.sort_classes()
+
+        assert gdxml_helpers.get_filtered_classes(state, "") == list(state.classes.items())
+        filtered = gdxml_helpers.get_filtered_classes(state, r"Node3?D?\.xml$")
+        assert [name for name, _ in filtered] == ["Node", "Node3D"]
+
 
 if __name__ == '__main__':
     unittest.main()